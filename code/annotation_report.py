@@ -11,19 +11,93 @@ Command line arguments for this program are listed below.  All arguments are opt
 can be provided in a configuration file.
     -c, --config    <path>      Configuration file.  If not provided, defaults to "annotation_report.config" located
                                 in the same directory as this program.
+    -j, --jobs      <int>       Number of worker processes used to parse annotation files.  If not provided,
+                                files are read by a pool of threads in this process.
     -o, --out       <path>      Path to output report file.  If not provided, the report is printed to stdout.
+                                If the path ends in ".gz", the report is gzip compressed.
 """
 
 # standard Python modules
 import argparse
+import collections
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import configparser
+import csv
+import functools
+import gzip
+import io
+import itertools
+import operator
 import os
+import sys
 
 # modules that are part of this package
 from utils.annotation import AnnotationList
 import utils.trailcamutils as trailcamutils
 
 
+# default configuration file, named after this module
+CONFIG_FILENAME = os.path.splitext(__file__)[0] + ".config"
+
+
+@functools.lru_cache(maxsize=None)
+def loadConfig(configFilename):
+    """
+    Reads and parses the specified configuration file.  Results are cached, so
+    each configuration file is only parsed once per process; callers must not
+    modify the returned ConfigParser.
+    """
+    config = configparser.ConfigParser()         
+    if not config.read([configFilename]):
+        raise FileNotFoundError(f"Configuration file not found: {configFilename}")
+    return config
+
+
+def parseAnnotationFile(filename, stat=None):
+    """
+    Reads in an annotation file.
+    Inputs:
+        filename        string; path to annotation file to read       
+        stat            os.stat_result for the file, or None if it should be looked up
+    Returns:
+        A list of the Annotation objects in file.
+    """
+    if stat is None:
+        stat = os.stat(filename)
+    if stat.st_size == 0:
+        # empty annotation files are common for days without activity; skip the parser
+        return []
+    lyst = AnnotationList()
+    lyst.readFromFile(filename, None)
+    return list(lyst)
+
+
+def readAnnotationEntry(name, path, stat):
+    """
+    Reads one annotation file.  This is a module-level function so it can be run
+    in a worker process.
+    Inputs:
+        name            string; annotation filename
+        path            string; full path to the annotation file
+        stat            os.stat_result for the file
+    Returns:
+        A tuple of the form (site ID, date, list of Annotation objects)
+    """
+    site, date = trailcamutils.splitAnnotationFilename(name)
+    return site, date, parseAnnotationFile(path, stat)
+
+
+def readAnnotationEntries(entries):
+    """
+    Reads a batch of annotation files in a worker process.
+    Inputs:
+        entries         list of (name, path, stat) tuples, as taken by readAnnotationEntry
+    Returns:
+        A list of (site ID, date, list of Annotation objects) tuples, in the order of entries
+    """
+    return [readAnnotationEntry(*entry) for entry in entries]
+
+
 class AppConfig:
     """ 
     Configuration settings for this application
@@ -32,9 +106,7 @@ class AppConfig:
         """
         Loads settings from the app configuration file.
         """
-        self.app_config = configparser.ConfigParser()         
-        assert os.path.exists(configFilename), f"Confguration file not found: {configFilename}"
-        self.app_config.read(configFilename)
+        self.app_config = loadConfig(configFilename)
         
         # general settings shared by multiple trail_camera_tools programs
         settings = self.app_config["General_Settings"] 
@@ -42,42 +114,70 @@ class AppConfig:
 
 
 class AnnotationReport:
-    def __init__(self, configFile=None):
+    READ_BATCH_SIZE = 16
+    READS_IN_FLIGHT = 4
+    ROWS_PER_WRITE = 8192
+    WRITE_BUFFER_SIZE = 1 << 20
+
+    def __init__(self, configFile=None, jobs=1):
         if configFile is None:
             configFile = self.getConfigFilename()
         self.app_config = AppConfig(configFile)
+        self.jobs = jobs                    # number of worker processes used to parse annotation files
 
 
-    def exportAnnotations(self, annotationDict, filename):
+    def exportAnnotations(self, annotations, filename):
         """
         Writes out the annotation records to a CSV file with the specified filename.
         Inputs:
-            annotationDict      Dictionary mapping site IDs to tuples of the form 
-                                    (date, AnnotationList objects, frame count) 
+            annotations         iterable of tuples of the form (site ID, date, Annotation object),
+                                    such as the generator returned by iterAnnotations
             filename            pathname of report file to generate, or None if 
-                                    output goes to stdout
+                                    output goes to stdout; if the name ends in ".gz", 
+                                    the report is gzip compressed
         """
         if filename is None:
-            print("site,file,activity,kind,individual,startTime,endTime,user")
-            for site, data in annotationDict.items():
-                for date, annots in data:
-                    for annot in annots:
-                        print(f"{site},{date},{annot.behavior},{annot.kind},{annot.individual},{annot.startTime},{annot.endTime},{annot.user}")
+            self.writeAnnotations(sys.stdout, annotations)
         else:
-            with open(filename, "w") as outFile:
-                outFile.write("site,file,activity,kind,individual,startTime,endTime,user\n")
-                for site, data in annotationDict.items():
-                    for date, annots in data:
-                        for annot in annots:
-                            outFile.write(f"{site},{date},{annot.behavior},{annot.kind},{annot.individual},{annot.startTime},{annot.endTime},{annot.user}\n")
+            if filename.endswith(".gz"):
+                # compress on the fly; level 1 keeps the compressor from becoming the bottleneck
+                outFile = gzip.open(filename, "wt", compresslevel=1, newline="")
+            else:
+                outFile = open(filename, "w", buffering=self.WRITE_BUFFER_SIZE, newline="")
+            with outFile:
+                self.writeAnnotations(outFile, annotations)
 
 
     def getConfigFilename(self):
         """
         Creates a config filename from the main module's file name.
         """
-        base, _ = os.path.splitext(__file__)
-        return base + ".config"
+        return CONFIG_FILENAME
+
+
+    def iterAnnotations(self):
+        """
+        Reads all the annotation files in the annotation folder, one file at a time.
+        Yields:
+            Tuples of the form (site ID, date, Annotation object), ordered by site ID and date
+        """
+        for site, date, annots in self._readAll(self.listAnnotationFiles()):
+            for annot in annots:
+                yield site, date, annot
+
+
+    def listAnnotationFiles(self):
+        """
+        Returns a list of os.DirEntry objects for the annotation files in the annotation
+        folder, sorted by site ID and then date, so the report has a deterministic row order.
+        The entries carry the full path of each file, and their stat information is reused
+        to skip empty files.
+        """
+        with os.scandir(self.app_config.annotation_folder) as entries:
+            files = [entry for entry in entries 
+                     if entry.name.lower().endswith(".annotations") and entry.is_file()]
+        files.sort(key=lambda entry: trailcamutils.splitAnnotationFilename(entry.name))
+        return files
 
 
     def main(self, filename):
@@ -86,21 +186,60 @@ class AnnotationReport:
         Input:
             filename        string; path to report file to generate
         """
-        annotationDict = self.readAnnotationFiles()
-        self.exportAnnotations(annotationDict, filename)
+        self.exportAnnotations(self.iterAnnotations(), filename)
         
 
-    def readAnnotationFile(self, filename):
+    def _readAll(self, files):
+        """
+        Reads the specified annotation files.  The files are parsed by a pool of 
+        self.jobs worker processes, or by a thread pool if self.jobs is 1.
+        Inputs:
+            files           list of os.DirEntry objects, as returned by listAnnotationFiles
+        Yields:
+            Tuples of the form (site ID, date, list of Annotation objects), in the order of files
+        """
+        if self.jobs > 1:
+            # parsing is CPU-bound on large corpora, so spread it across processes in batches; 
+            # directory entries cannot be pickled, so the workers receive their names, paths, and stats
+            workers = self.jobs
+            batchSize = self.READ_BATCH_SIZE
+            executor = ProcessPoolExecutor(max_workers=workers)
+            def submit(batch):
+                return executor.submit(readAnnotationEntries, [(entry.name, entry.path, entry.stat()) for entry in batch])
+        else:
+            # read the files concurrently; the work is dominated by file I/O
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            batchSize = 1
+            executor = ThreadPoolExecutor(max_workers=workers)
+            def submit(batch):
+                return executor.submit(lambda: [readAnnotationEntry(entry.name, entry.path, entry.stat()) for entry in batch])
+
+        # keep only a few batches per worker in flight, so parsed files do not pile up in 
+        # memory faster than the caller consumes them
+        entries = iter(files)
+        pending = collections.deque()
+        with executor:
+            while True:
+                while len(pending) < workers * self.READS_IN_FLIGHT:
+                    batch = list(itertools.islice(entries, batchSize))
+                    if not batch:
+                        break
+                    pending.append(submit(batch))
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+
+
+    def readAnnotationFile(self, filename, stat=None):
         """
         Reads in an annotation file.
         Inputs:
             filename        string; path to annotation file to read       
+            stat            os.stat_result for the file, or None if it should be looked up
         Returns:
-            An AnnotationList object containing the annotations in file.
+            A list of the Annotation objects in file.
         """
-        lyst = AnnotationList()
-        lyst.readFromFile(filename, None)
-        return lyst
+        return parseAnnotationFile(filename, stat)
 
 
     def readAnnotationFiles(self):
@@ -108,23 +247,41 @@ class AnnotationReport:
         Reads all the annotation files in the annotation folder.
         Returns:
             A dictionary mapping site IDs to lists of tuples of the form
-                (date, AnnotationList objects)
+                (date, list of Annotation objects)
         """    
         annotations = {}
 
-        files = trailcamutils.getFilenamesInFolder(self.app_config.annotation_folder, '.annotations')    
-        for filename in files:
-            site, date = trailcamutils.splitAnnotationFilename(filename)
-            # read the annotation file
-            annots = self.readAnnotationFile(os.path.join(self.app_config.annotation_folder, filename))
+        for site, date, annots in self._readAll(self.listAnnotationFiles()):
             # add annotations to dictionary
-            if site in annotations:
-                annotations[site].append((date, annots))
-            else:
-                annotations[site] = [(date, annots)]
+            annotations.setdefault(site, []).append((date, annots))
 
         return annotations  
 
+
+    def writeAnnotations(self, outFile, annotations):
+        """
+        Writes the annotation records, in CSV format, to an open text stream.
+        Inputs:
+            outFile             text stream the report is written to
+            annotations         iterable of tuples of the form (site ID, date, Annotation object)
+        """
+        outFile.write("site,file,activity,kind,individual,startTime,endTime,user\n")
+        # every field is converted to a string up front, so the csv writer only joins strings
+        fields = operator.attrgetter("behavior", "kind", "individual", "startTime", "endTime", "user")
+        rows = ((site, date, *map(str, fields(annot))) for site, date, annot in annotations)
+        # rows are formatted by the C-implemented csv writer into an in-memory buffer,
+        # which is flushed to outFile with one write per batch of rows
+        buffer = io.StringIO()
+        writerows = csv.writer(buffer, lineterminator="\n").writerows
+        write = outFile.write
+        while True:
+            writerows(itertools.islice(rows, self.ROWS_PER_WRITE))
+            if buffer.tell() == 0:
+                break
+            write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+
         
 def parseCommandLine():
     """
@@ -133,6 +290,7 @@ def parseCommandLine():
     """
     ap = argparse.ArgumentParser()
     ap.add_argument("-c", "--config", required=False, default=None, help="path to configuration file")
+    ap.add_argument("-j", "--jobs", required=False, default=1, type=int, help="number of processes used to parse annotation files")
     ap.add_argument("-o", "--output", required=False, default=None, help="path for output report file")    
     args = vars(ap.parse_args())
     return args
@@ -140,5 +298,5 @@ def parseCommandLine():
 
 if __name__ == "__main__":
     args = parseCommandLine()    
-    app = AnnotationReport(args["config"])
+    app = AnnotationReport(args["config"], args["jobs"])
     app.main(args["output"])    
\ No newline at end of file
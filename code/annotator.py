@@ -6,14 +6,18 @@ Mike Hilton and Mark Yamane, Eckerd College
 
 # standard Python modules
 import argparse
+import collections
 import configparser
 import getpass
 import __main__
 import os
+from pathlib import PurePath
+import re
 import sys
 
 # 3rd party modules
 import cv2
+import numpy as np
 from PySide2 import QtCore, QtGui, QtWidgets
 
 # modules that are part of this package
@@ -72,7 +76,37 @@ class AppConfig:
                     self.views[str(digit)] = (parts[0].strip(), parts[1].strip())
 
 
+class FrameWriter(QtCore.QRunnable):
+    """
+    Writes a single frame to an image file on a QThreadPool worker thread.
+    """
+    def __init__(self, filename, frame):
+        """
+        Inputs:
+            filename        string; path of the image file to write
+            frame           numpy array; the image, which must not be shared with the viewer
+        """
+        super().__init__()
+        self.filename = filename                # path of the image file to write
+        self.frame = frame                      # image to write
+
+    def run(self):
+        """
+        Encodes the frame in memory, in the format given by the filename's extension, then
+        writes it with a single call.
+        """
+        ok, buffer = cv2.imencode(os.path.splitext(self.filename)[1], self.frame)
+        if ok:
+            with open(self.filename, "wb") as outFile:
+                outFile.write(buffer.tobytes())
+
+
 class AnnotatorApp(TLV_ApplicationWindow):
+    BOX_VALUE_PATTERN = re.compile(rb"-?\d+(?:\.\d+)?")   # matches each number in a detection box file
+    IMAGE_BOXES_CACHE_SIZE = 256            # number of parsed image box files kept in memory
+    READ_BUFFER_SIZE = 1 << 20              # buffer size used when reading detection box files
+    VIDEO_BOXES_CACHE_SIZE = 4              # number of parsed video box files kept in memory
+
     def __init__(self, configFile):
         # read the configuration file
         if configFile is None:
@@ -82,15 +116,30 @@ class AnnotatorApp(TLV_ApplicationWindow):
         super().__init__()
         # intialize instance variables        
         self._annotations = AnnotationList()    # list of annotations for the current video             
+        self._addedAnnotations = []             # annotations added since the table was last refreshed
+        self._boxPathPrefix = None              # boxes folder path, ending in a separator, for the current image sequence
         self.commensalBehaviors = {}            # dictionary mapping commensal ID to properties dictionary
         self._commensalEditor = None            # AnnotationEditor object for commensals
+        self._configActivities = {}             # maps config section name to its parsed activity dictionary
+        self._configLists = {}                  # maps config section name to its list of keys
         self._countEditor = None                # CountEditor object               
+        self._countSpan = None                  # (start, end) frames of the count annotation spanning the current frame, if any
         self._dirty = False                     # tracks if contents of _annotations has changed
+        self._eventFramesCache = {}             # maps excludeAI flag to sorted array of event frames; cleared when annotations change
+        self._imageBoxesCache = collections.OrderedDict()   # LRU cache mapping (filename, mtime) to arrays of image boxes
+        self._modificationCount = 0             # number of annotation modifications since the table was last refreshed
         self._odBoxes = None                    # list of object detection boxes for current frame                      
         self._focalEditor = None                # AnnotationEditor object for focal animals
+        self._folderIndex = {}                  # maps video filenames in _folderListing to their position in it
+        self._folderListing = []                # sorted list of (filename, view, date) for videos in the current folder
+        self._folderListingForPath = None       # (folder, mtime) that _folderListing was built from
         self.focalBehaviors = {}                # dictionary mapping focal animal ID to properties dictionary          
+        self._penCache = {}                     # maps box color (QColor.rgb()) to the QPen used to draw it
+        self._refreshPending = False            # indicates if a table and timeline refresh has been scheduled
+        self._sequenceNames = None              # (sequence, names) memo of _getSequenceNames for the loaded sequence
         self.userName = None                    # username of person running this program      
-        self._videoOdBoxes = None               # dictionary mapping frame indices to lists of object detection boxes
+        self._videoOdBoxes = None               # dictionary mapping frame indices to arrays of object detection boxes
+        self._videoBoxesCache = collections.OrderedDict()   # LRU cache mapping (filename, mtime) to parsed video box files
         # perform intialization actions
         self.setAppTitle("Video Annotator")
         self.setWindowTitle(self.getAppTitle())  
@@ -99,9 +148,8 @@ class AnnotatorApp(TLV_ApplicationWindow):
         self.userName = getpass.getuser()
         self._addAnnotatorMenus()
         self._addAnnotatorWidgets()
-        self._annotations.modified.connect(self._isDirty)
-        self._annotations.modified.connect(self._timeline.annotationsModified)
-        self._annotations.modified.connect(self._annotTable.fillTable)
+        self._annotations.added.connect(self._annotationAdded)
+        self._annotations.modified.connect(self._annotationsModified)
         # set up the callbacks
         self.setFrameChangeCallback(self._frameChangeCallback)
         self.setDrawCallback(self._frameDrawCallback)
@@ -144,19 +192,16 @@ class AnnotatorApp(TLV_ApplicationWindow):
             if self._commensalEditor is not None:
                 self._commensalEditor.reset()
         # load the annotations for this sequence
-        filename = os.path.abspath(self._getAnnotationFilename())
+        filename, burrow_ID, base = self._getSequenceNames()
+        filename = os.path.abspath(filename)
         if os.path.exists(filename):
             self._annotations.readFromFile(filename, self.tlviewer.getImageSequence())
         # if this is a video, look for boxes file
         self._odBoxes = None
         self._videoOdBoxes = None
         if self._videoOpen:
-            filename = self.getFilename()
-            burrow_ID, _, _ = trailcamutils.splitVideoFilename(filename, self.app_config.prefix, self.app_config.views)
-            box_path = os.path.join(self.app_config.videoBoxesFolder, burrow_ID)			
-            box_file = os.path.join(box_path, os.path.splitext(os.path.basename(filename))[0] + ".vboxes")
-            if os.path.exists(box_file):
-                self._videoOdBoxes = self.readVideoBoxes(box_file)
+            box_file = os.path.join(self.app_config.videoBoxesFolder, burrow_ID, base + ".vboxes")
+            self._videoOdBoxes = self._cachedBoxes(self._videoBoxesCache, self.VIDEO_BOXES_CACHE_SIZE, self.readVideoBoxes, box_file)
         # enable the editor container
         self._editorContainer.setEnabled(True)
         # enable menu items
@@ -169,6 +214,30 @@ class AnnotatorApp(TLV_ApplicationWindow):
         self.enableTimeLineWidgets(True)
 
 
+    @QtCore.Slot(object)
+    def _annotationAdded(self, annotation):
+        """
+        Called when an annotation is added to the annotation list.  Remembers the annotation
+        so the table can insert just its row.
+        """
+        self._addedAnnotations.append(annotation)
+
+    @QtCore.Slot()
+    def _annotationsModified(self):
+        """
+        Called whenever the annotation list is modified.  Sets the annotations dirty flag and
+        discards the cached event frames right away, but defers rebuilding the table and
+        timeline to the next pass through the event loop, so a burst of modifications
+        only rebuilds them once.
+        """
+        self._dirty = True
+        self._countSpan = None
+        self._eventFramesCache.clear()
+        self._modificationCount += 1
+        if not self._refreshPending:
+            self._refreshPending = True
+            QtCore.QTimer.singleShot(0, self._refreshAnnotationViews)
+
     def beforeLoadingSequence(self):
         """
         This method is called before a new video file or image sequence is loaded.
@@ -176,6 +245,36 @@ class AnnotatorApp(TLV_ApplicationWindow):
         if self._dirty:
             self.saveAnnotations()
             self._dirty = False
+        self._boxPathPrefix = None
+        self._imageBoxesCache.clear()
+        self._sequenceNames = None
+
+    def _cachedBoxes(self, cache, maxSize, reader, filename):
+        """
+        Returns the parsed contents of an object detection box file, reading the file only if
+        it is not already in the supplied LRU cache.  Cache entries are keyed by filename and
+        modification time, so edited box files are read again.
+        Inputs:
+            cache           OrderedDict; the LRU cache to use
+            maxSize         int; maximum number of entries kept in cache
+            reader          function that parses the box file
+            filename        string; path to the box file
+        Returns:
+            The parsed boxes, or None if the box file does not exist.
+        """
+        try:
+            key = (filename, os.stat(filename).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+        boxes = cache.get(key)
+        if boxes is None:
+            boxes = reader(filename)
+            cache[key] = boxes
+            if len(cache) > maxSize:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return boxes
 
     def closeEvent(self, event):
         """
@@ -184,6 +283,8 @@ class AnnotatorApp(TLV_ApplicationWindow):
         # save the annotations for this file, if they have changed
         if self._dirty:        
             self.saveAnnotations()
+        # finish writing any training images
+        QtCore.QThreadPool.globalInstance().waitForDone()
         event.accept()
         
     def _createEditorWidgets(self, layout):
@@ -271,6 +372,17 @@ class AnnotatorApp(TLV_ApplicationWindow):
         """
         self.navBox.setEnabled(enabled)
 
+    def _eventFrames(self, excludeAI):
+        """
+        Returns a sorted int64 numpy array of the event frames in the annotation list.  The
+        array is cached until the annotations are modified.
+        """
+        frames = self._eventFramesCache.get(excludeAI)
+        if frames is None:
+            frames = np.asarray(self._annotations.eventFrames(excludeAI), dtype=np.int64)
+            self._eventFramesCache[excludeAI] = frames
+        return frames
+
     def exitNoSave(self):
         """
         Exit the program without saving the annotations.  Works by setting the _dirty flag to False, then
@@ -285,28 +397,35 @@ class AnnotatorApp(TLV_ApplicationWindow):
         - loads the object detection boxes into the list self._odBoxes
         - enables the span editor button if the index falls between an annotation segment
         """
-        # enable span editor button, if called for
+        # enable span editor button, if called for; skip the search while inside the last span found
         if self._focalEditor is not None:
-            self._focalEditor.spanBtn.setEnabled(
-                self._annotations.findSpanningEvent(index+1, "count", None) is not None
-                )
+            frame = index + 1
+            span = self._countSpan
+            if (span is None) or not (span[0] <= frame <= span[1]):
+                event = self._annotations.findSpanningEvent(frame, "count", None)
+                if event is None:
+                    self._countSpan = None
+                else:
+                    self._countSpan = (event.startFrame, event.startFrame if event.endFrame is None else event.endFrame)
+                self._focalEditor.spanBtn.setEnabled(event is not None)
 
         # load object detection boxes
         if not self.app_config.showOdBoxes:
             return
         if self.videoIsOpen():
             if self._videoOdBoxes is not None:
-                self._odBoxes = self._videoOdBoxes.get(index, None)
+                boxes = self._videoOdBoxes.get(index, None)
+                self._odBoxes = None if boxes is None else self._qtBoxes(boxes)
         else:
-            # construct path to boxes file
+            # construct path to boxes file; all images in a sequence share the same boxes folder
             filename = os.path.basename(self.getFrameFilename(index))            
-            imagePath = trailcamutils.imagePathFromFilename(filename, self.app_config.prefix, self.app_config.views)
+            if self._boxPathPrefix is None:
+                imagePath = trailcamutils.imagePathFromFilename(filename, self.app_config.prefix, self.app_config.views)
+                self._boxPathPrefix = os.path.join(self.app_config.boxesFolder, imagePath, "")
             base, _ = os.path.splitext(filename)
-            boxPath = os.path.join(self.app_config.boxesFolder, imagePath, base + ".boxes")
-            if os.path.exists(boxPath):
-                self._odBoxes = self.readImageBoxes(boxPath)
-            else:
-                self._odBoxes = None
+            boxPath = self._boxPathPrefix + base + ".boxes"
+            boxes = self._cachedBoxes(self._imageBoxesCache, self.IMAGE_BOXES_CACHE_SIZE, self.readImageBoxes, boxPath)
+            self._odBoxes = None if boxes is None else self._qtBoxes(boxes)
 
 
     def _frameDrawCallback(self, painter):
@@ -316,8 +435,11 @@ class AnnotatorApp(TLV_ApplicationWindow):
         if (self._odBoxes is not None) and self.app_config.showOdBoxes:
             for box in self._odBoxes:
                 rect, color = box
-                pen = QtGui.QPen(color)
-                pen.setWidth(6)
+                pen = self._penCache.get(color.rgb())
+                if pen is None:
+                    pen = QtGui.QPen(color)
+                    pen.setWidth(6)
+                    self._penCache[color.rgb()] = pen
                 painter.setPen(pen)
                 painter.drawRect(rect)
 
@@ -326,36 +448,7 @@ class AnnotatorApp(TLV_ApplicationWindow):
         Returns the name of the annotation file associated with the current
         image sequence.
         """
-        # determine if this is a video file or an image sequence
-        sequence = self.getTimeLapseViewer().getImageSequence()
-        if sequence is None:
-            return None
-        if type(sequence) is utils.timelapse.image_sequence.VideoSequence:
-            base, _ = os.path.splitext(os.path.basename(sequence.getFilename()))
-            site_ID, _, date = trailcamutils.splitVideoFilename(base, self.app_config.prefix, self.app_config.views)
-            return os.path.join(self.app_config.annotationFolder, 
-                                trailcamutils.createAnnotationFilename(site_ID, date, self.app_config.prefix))
-        else:
-            def splitall(path):
-                allparts = []
-                while 1:
-                    parts = os.path.split(path)
-                    if parts[0] == path:  # sentinel for absolute paths
-                        allparts.insert(0, parts[0])
-                        break
-                    elif parts[1] == path: # sentinel for relative paths
-                        allparts.insert(0, parts[1])
-                        break
-                    else:
-                        path = parts[0]
-                        allparts.insert(0, parts[1])
-                return allparts 
-            # build a file name from the last three dir names in sequence path
-            folder = os.path.abspath(sequence.getFilename())
-            parts = splitall(folder)
-            parts.reverse()
-            fname = trailcamutils.createAnnotationFilename(parts[2], parts[1], "")
-            return os.path.join(self.app_config.annotationFolder, fname)
+        return self._getSequenceNames()[0]
 
     def getConfigFilename(self):
         """
@@ -364,6 +457,21 @@ class AnnotatorApp(TLV_ApplicationWindow):
         base, _ = os.path.splitext(__main__.__file__)
         return base + ".config"
 
+    def _getFolderListing(self, folder):
+        """
+        Returns a sorted list of (filename, view, date) tuples for the videos in the specified
+        folder.  The parsed listing is reused until the folder or its modification time changes.
+        """
+        key = (folder, os.stat(folder).st_mtime_ns)
+        if key != self._folderListingForPath:
+            self._folderListing = [
+                (name, *trailcamutils.splitVideoFilename(name, self.app_config.prefix, self.app_config.views)[1:])
+                for name in trailcamutils.getFilenamesInFolder(folder, ".mp4")
+            ]
+            self._folderIndex = {name: i for i, (name, _, _) in enumerate(self._folderListing)}
+            self._folderListingForPath = key
+        return self._folderListing
+
     def getFrameDateTime(self, i):
         """
         Returns the datetime object for the current frame.
@@ -374,6 +482,33 @@ class AnnotatorApp(TLV_ApplicationWindow):
         else:
             return sequence.frameTime(i)
 
+    def _getSequenceNames(self):
+        """
+        Splits the current image sequence's path once into the names derived from it.
+        Returns a tuple of the form (annotation filename, site ID, base filename), where
+        base filename is the video filename without folder or extension.  For image
+        sequences the base filename is None; if nothing is loaded all three are None.
+        The names are computed once per loaded sequence.
+        """
+        # determine if this is a video file or an image sequence
+        sequence = self.getTimeLapseViewer().getImageSequence()
+        if sequence is None:
+            return (None, None, None)
+        if (self._sequenceNames is not None) and (self._sequenceNames[0] is sequence):
+            return self._sequenceNames[1]
+        if type(sequence) is utils.timelapse.image_sequence.VideoSequence:
+            base, _ = os.path.splitext(os.path.basename(sequence.getFilename()))
+            site_ID, _, date = trailcamutils.splitVideoFilename(base, self.app_config.prefix, self.app_config.views)
+            fname = trailcamutils.createAnnotationFilename(site_ID, date, self.app_config.prefix)
+            names = (os.path.join(self.app_config.annotationFolder, fname), site_ID, base)
+        else:
+            # build a file name from the last three dir names in sequence path
+            parts = PurePath(os.path.abspath(sequence.getFilename())).parts
+            fname = trailcamutils.createAnnotationFilename(parts[-3], parts[-2], "")
+            names = (os.path.join(self.app_config.annotationFolder, fname), parts[-3], None)
+        self._sequenceNames = (sequence, names)
+        return names
+
     def gotoEvent(self, frame, behavior, individual, kind):
         """
         Sets the current time lapse viewer frame to the start frame of the event, and selects
@@ -401,30 +536,21 @@ class AnnotatorApp(TLV_ApplicationWindow):
 
 
 
-    @QtCore.Slot()
-    def _isDirty(self):
-        """
-        Sets the annotations dirty flag to True.
-        """
-        self._dirty = True
-
-
     def nextEvent(self):
         """
         Navigates from current video frame to the next frame that has an event in the annotation list.
-        If there are no events after the current frame, do nothing.
+        If there are no events after the current frame, go to the last event.
         """
-        current = self.getTimeLapseViewer().getCurrentFrame()
-        eventFrames = self._annotations.eventFrames(not (self.app_config.countOnly or self.app_config.showAnimalDetection))
-        # goto the first event frame after current frame
-        event = None
-        for event in eventFrames:
-            if current < event:
-                break
-        if event is None:
+        tlv = self.getTimeLapseViewer()
+        current = tlv.getCurrentFrame()
+        eventFrames = self._eventFrames(not (self.app_config.countOnly or self.app_config.showAnimalDetection))
+        if len(eventFrames) == 0:
             return
+        # goto the first event frame after current frame
+        idx = int(np.searchsorted(eventFrames, current, side="right"))
+        event = int(eventFrames[min(idx, len(eventFrames)-1)])
 
-        self.getTimeLapseViewer().gotoFrame(event)
+        tlv.gotoFrame(event)
         ann = self._annotTable.gotoEvent(event)
         if ann is not None:
             frame, behavior, id, kind = ann
@@ -435,23 +561,25 @@ class AnnotatorApp(TLV_ApplicationWindow):
         """
         Load the next video or image sequence after the current one.
         """
-        seq = self.getTimeLapseViewer()._imageSequence.getFilename()
+        sequence = self.getTimeLapseViewer().getImageSequence()
+        seq = sequence.getFilename()
         folder = os.path.dirname(seq)
-        if self.getTimeLapseViewer()._imageSequence.isVideo():
-            files = trailcamutils.getFilenamesInFolder(folder, ".mp4")
-            idx = files.index(os.path.basename(seq)) + 1
-            _, view, currDate = trailcamutils.splitVideoFilename(seq, self.app_config.prefix, self.app_config.views)
+        if sequence.isVideo():
+            files = self._getFolderListing(folder)
+            idx = self._folderIndex[os.path.basename(seq)]
+            _, view, currDate = files[idx]
+            idx += 1
             nextDate = currDate
             nextView = None
             # move past other videos for this day
             while idx < len(files):
-                _, nextView, nextDate = trailcamutils.splitVideoFilename(files[idx], self.app_config.prefix, self.app_config.views)
+                _, nextView, nextDate = files[idx]
                 if (nextDate > currDate) and (nextView == view):
                     break
                 idx += 1
             # load the next video
             if (idx < len(files)) and (nextDate > currDate) and (nextView == view):
-                self.openVideo(os.path.join(folder, files[idx]))
+                self.openVideo(os.path.join(folder, files[idx][0]))
             else:
                 QtWidgets.QMessageBox.information(self, "Next Video", "No more videos in this folder", QtWidgets.QMessageBox.StandardButton.Ok)
         else:
@@ -478,98 +606,118 @@ class AnnotatorApp(TLV_ApplicationWindow):
         """
         Navigates from the current video frame to the previous frame that has an event in the annotation list.
         """
-        current = self.getTimeLapseViewer().getCurrentFrame()
-        eventFrames = self._annotations.eventFrames(not self.app_config.countOnly)
-        # goto the first event frame before current frame
-        i = 0
-        for event in eventFrames:
-            if current <= event:
-                break  
-            i = event  
+        tlv = self.getTimeLapseViewer()
+        current = tlv.getCurrentFrame()
+        eventFrames = self._eventFrames(not self.app_config.countOnly)
+        # goto the last event frame before current frame, or the first frame if there is none
+        idx = int(np.searchsorted(eventFrames, current, side="left"))
+        i = int(eventFrames[idx-1]) if idx > 0 else 0
 
-        self.getTimeLapseViewer().gotoFrame(i)
+        tlv.gotoFrame(i)
         ann = self._annotTable.gotoEvent(i)
         if ann is not None:
             frame, behavior, id, kind = ann
             self.gotoEvent(frame, behavior, id, kind)        
 
+    def _qtBoxes(self, boxes):
+        """
+        Converts an array of boxes, with rows of the form (yl, xl, yu, xu, R, G, B), into
+        a tuple of (QRectF, QColor) pairs for drawing.  Image and video boxes are cached as
+        arrays, so the Qt objects are only created for the frame being displayed.
+        """
+        return tuple(
+            (QtCore.QRectF(QtCore.QPointF(xl, yl), QtCore.QPointF(xu, yu)), QtGui.QColor(r, g, b))
+            for yl, xl, yu, xu, r, g, b in boxes.tolist()
+        )
+
+    def _readBoxValues(self, filename, columns):
+        """
+        Reads all of the numbers in a detection box file with a single regular expression scan.
+        Values written with a decimal point are rounded to the nearest integer.
+        Inputs:
+            filename        string; path to a .boxes or .vboxes file
+            columns         int; number of comma-separated values on each line of the file
+        Returns:
+            An integer numpy array with one row per line of the file.
+        """
+        with open(filename, "rb", buffering=self.READ_BUFFER_SIZE) as f:
+            data = f.read()
+        values = self.BOX_VALUE_PATTERN.findall(data)
+        if len(values) % columns != 0:
+            raise ValueError(f"Malformed detection box file: {filename}")
+        values = np.array(values)
+        if b"." in data:
+            values = np.rint(values.astype(np.float64))
+        return values.astype(np.int32).reshape(-1, columns)
+
     def readConfigActivities(self, section):
         """
-        Reads a dictionary mapping activity names to specifications from the supplied section
-        of the application config file.
-        """
-        answer = {}
-        config = self.getConfig()
-        if section in config:
-            for key, value in config[section].items():
-                # create a dictionary of the properties found in the value
-                parts = value.split(',')
-                properties = {}
-                properties['color'] = parts[0].strip()
-                properties['arity'] = parts[1].strip()
-                # add to the activity dictionary
-                answer[key] = properties
-        return answer
+        Returns a dictionary mapping activity names to specifications from the supplied section
+        of the application config file.  Each section is parsed only once; callers get a copy.
+        """
+        answer = self._configActivities.get(section)
+        if answer is None:
+            answer = {}
+            config = self.getConfig()
+            if section in config:
+                for key, value in config[section].items():
+                    # create a dictionary of the properties found in the value
+                    parts = value.split(',')
+                    answer[key] = {'color': parts[0].strip(), 'arity': parts[1].strip()}
+            self._configActivities[section] = answer
+        return dict(answer)
 
     def readConfigList(self, section):
         """
-        Reads a list of strings from the specified section of the application config file.
-        These should be sections containing only keys, no values.
+        Returns a list of strings from the specified section of the application config file.
+        These should be sections containing only keys, no values.  Each section is read only once.
         """
-        answer = []
-        config = self.getConfig()
-        if section in config:
-            answer = list(config[section].keys())
-        return answer          
+        answer = self._configLists.get(section)
+        if answer is None:
+            config = self.getConfig()
+            answer = list(config[section].keys()) if section in config else []
+            self._configLists[section] = answer
+        return list(answer)
 
     def readImageBoxes(self, filename):
         """
         Reads the object detection box information from the specified file.
-        Returns a list of the detection boxes.
-        """
-        boxes = []
-        with open(filename, "r") as f:
-            for line in f:
-                parts = line.strip().split(",")
-                yl = int(parts[0])
-                xl = int(parts[1])
-                yu = int(parts[2])
-                xu = int(parts[3])
-                color_R = int(parts[4])
-                color_G = int(parts[5])
-                color_B = int(parts[6])
-
-                rect = QtCore.QRectF(QtCore.QPointF(xl, yl), QtCore.QPointF(xu, yu))
-                color = QtGui.QColor(color_R, color_G, color_B)
-                boxes.append((rect, color))
-        return boxes
+        Returns an int16 numpy array of boxes, with one row of the form
+        (yl, xl, yu, xu, R, G, B) per box.
+        """
+        return self._readBoxValues(filename, 7).astype(np.int16)
 
     def readVideoBoxes(self, filename):
         """
         Reads the object detection box information from the specified video.
-        Returns a dictionary mapping frame index to list of boxes.
-        """
-        boxes = {}
-        with open(filename, "r") as f:
-            for aLine in f:
-                parts = aLine.strip().split(",")
-                frame = int(parts[0])
-                yl = int(parts[1])
-                xl = int(parts[2])
-                yu = int(parts[3])
-                xu = int(parts[4])
-                color_R = int(parts[5])
-                color_G = int(parts[6])
-                color_B = int(parts[7])
-
-                rect = QtCore.QRectF(QtCore.QPointF(xl, yl), QtCore.QPointF(xu, yu))
-                color = QtGui.QColor(color_R, color_G, color_B)
-
-                if frame not in boxes:
-                    boxes[frame] = []
-                boxes[frame].append((rect, color))
-        return boxes
+        Returns a dictionary mapping frame index to an int16 numpy array of boxes,
+        with one row of the form (yl, xl, yu, xu, R, G, B) per box.  The Qt objects
+        are only built for the displayed frame, by _frameChangeCallback.
+        """
+        data = self._readBoxValues(filename, 8)
+        if len(data) == 0:
+            return {}
+        # group the rows by frame index
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        frames, starts = np.unique(data[:, 0], return_index=True)
+        boxes = data[:, 1:].astype(np.int16)
+        return dict(zip(frames.tolist(), np.split(boxes, starts[1:])))
     
+    def _refreshAnnotationViews(self):
+        """
+        Updates the annotation table and timeline after one or more modifications.  If every
+        modification was an addition, only the new rows are added to the table; otherwise the
+        table is rebuilt.
+        """
+        self._refreshPending = False
+        self._timeline.annotationsModified()
+        if self._modificationCount == len(self._addedAnnotations):
+            self._annotTable.addAnnotations(self._addedAnnotations)
+        else:
+            self._annotTable.fillTable()
+        self._addedAnnotations = []
+        self._modificationCount = 0
+
     def saveAnnotations(self):
         """
         Saves the annotations associated with the current image sequence.
@@ -607,8 +755,9 @@ class AnnotatorApp(TLV_ApplicationWindow):
         """
         Writes the current frame to the ML training folder.
         """
-        idx = self.getCurrentFrame()
-        seq = self.getTimeLapseViewer()._imageSequence
+        tlv = self.getTimeLapseViewer()
+        idx = tlv.getCurrentFrame()
+        seq = tlv.getImageSequence()
         if seq.isVideo():            
             # create a file name for the saved image
             date_time = seq.frameTime(idx)
@@ -618,9 +767,9 @@ class AnnotatorApp(TLV_ApplicationWindow):
             filename = trailcamutils.createImageFilename(self.app_config.prefix, site_ID, date, time, ".jpg", self.app_config.views)
         else:
             filename = os.path.basename(seq.getImageFilename(idx))
-        # save the image
-        frame = self.tlviewer.frame(idx)
-        cv2.imwrite(os.path.join(self.app_config.trainingFolder, filename), frame)
+        # save the image on a worker thread; copy the frame in case the viewer reuses its buffer
+        frame = tlv.frame(idx).copy()
+        QtCore.QThreadPool.globalInstance().start(FrameWriter(os.path.join(self.app_config.trainingFolder, filename), frame))
 
 
 
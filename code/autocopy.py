@@ -42,12 +42,15 @@ can be provided in a configuration file.
 
 # standard Python modules
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import configparser
-from datetime import datetime, timezone
+from datetime import datetime
 import logging
 import os
-import pytz
-import shutil
+import queue
+import threading
+import time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 # 3rd party modules
 import psutil  
@@ -74,6 +77,13 @@ class AppConfig:
         self.error_log_file = settings.get("error_log_file", "error.log")   # path to error log
         self.prefix = settings.get("prefix", "")                            # filename prefix string        
         self.time_zone = settings.get("time_zone", "US/Eastern")            # your time zone designator
+        try:
+            self.tz = ZoneInfo(self.time_zone)                              # time zone object for time_zone
+        except (ZoneInfoNotFoundError, ValueError):
+            raise Exception(
+                f"Unknown time_zone in configuration file: {self.time_zone}.  Check the name; if it is correct, "
+                "this computer has no time zone database, so install the tzdata package (pip install tzdata)"
+            ) from None
 
         # settings specific to this program 
         settings = self.app_config["Autocopy"]        
@@ -115,16 +125,41 @@ class DriveStatus:
     """
     def __init__(self, driveName, volumeName, usedSpace):
         # initialize instance variables
+        self.bytes_copied = None                                            # number of bytes copied from drive
         self.drive_name = driveName                                         # name of drive
         self.failure_count = None                                           # number of files unsuccessfully processed
         self.file_count = None                                              # number of files on drive
         self.files = None                                                   # list of files to be processed
+        self.skipped_count = None                                           # number of files skipped at the start and end of the drive
         self.used_space = usedSpace                                         # the percentage of space used on the drive
         self.success_count = None                                           # number of files successfully processed
         self.volume_name = volumeName                                       # name of volume             
 
 
 class AutoCopy:
+    COPY_QUEUE_DEPTH = 16                                                   # maximum number of image copies in flight
+    COPY_WORKERS = 4                                                        # number of threads copying images when a single drive is processed
+
+    # boilerplate at the top of the HTML report
+    HTML_HEAD = """<!DOCTYPE html>
+            <html>
+            <head>
+                <title>Trail Camera Autocopy Status</title>
+                <meta http-equiv="refresh" content="10">
+                <style>
+                table, th, td {
+                border: 1px solid black;
+                border-collapse: collapse;
+                }
+                th, td {
+                padding: 15px;
+                }
+                </style>
+            </head>
+            <body>"""
+    HTML_REPORT_INTERVAL = 2.0                                              # minimum number of seconds between progress updates of the HTML report
+    OCR_BATCH_SIZE = 16                                                     # number of images whose metadata is extracted together by OCR
+
     def __init__(self, configFile=None, createHtml=True):
         # read the configuration file
         if configFile is None:
@@ -135,11 +170,16 @@ class AutoCopy:
         self.abort = False                                                  # indicates if the autocopy process should abort
         self.arg_camera_id = None                                           # Camera ID provided on command line
         self.arg_view = None                                                # camera view provided on command line
+        self.copy_workers = self.COPY_WORKERS                               # number of threads copying images for each drive
         self.create_html = createHtml                                       # indicates if an HTML web page containing status info should be created
+        self.created_folders = set()                                        # destination folders known to exist
         self.drive_status = {}                                              # dictionary mapping drive name to status information
         self.errors = []                                                    # list of error strings
+        self.last_html_report = 0.0                                         # time.monotonic() when the HTML report was last written
+        self.model_lock = threading.Lock()                                  # serializes use of the OCR and object detector by drive threads
         self.object_detector = None                                         # object detection class instance
         self.ocr = None                                                     # optical character reader for image metadata        
+        self.status_lock = threading.RLock()                                # guards drive status, error list, and HTML report shared by drive threads
         
         # initialization actions
         if createHtml:
@@ -172,9 +212,7 @@ class AutoCopy:
         """
         Returns the current local time
         """
-        utc_dt = datetime.now(timezone.utc)
-        tzone = pytz.timezone(self.app_config.time_zone)
-        return utc_dt.astimezone(tzone)
+        return datetime.now(self.app_config.tz)
     
 
     def extractImageInfo(self, gray_img, ext):
@@ -194,74 +232,123 @@ class AutoCopy:
         fname = trailcamutils.createImageFilename(camera, view, date, time, ext)
         destination_path = os.path.join(view_directory, fname)
         # create any missing folders in the path
-        os.makedirs(view_directory, exist_ok=True)
+        self._makeFolder(view_directory)
 
         return camera, destination_path, fname
 
 
+    def _copyImage(self, file, data, destination_path):
+        """
+        Copies an image to the destination file, writing its contents if they have already
+        been read and otherwise copying the source file.  Nothing is copied once the process
+        has been aborted.
+        Returns the number of bytes written.
+        """
+        if self.abort:
+            return 0
+        if data is None:
+            return trailcamutils.copyFile(file, destination_path)
+        return self._writeImage(data, destination_path)
+
+
+    def _finishFile(self, status, the_camera, file, copy, destination_path, view):
+        """
+        Waits for an image's copy to complete, then runs the object detector on it and records
+        the outcome in the status object.
+        Inputs:
+            status              DriveStatus; status object for the drive being processed
+            the_camera          string; camera ID, for error messages
+            file                string; path to the source image
+            copy                Future for the image's copy, or None if the image is not copied
+            destination_path    string; path to the copied image
+            view                string; camera view abbreviation, or None
+        """
+        if self.abort:
+            # the image is left unfinished; stop its copy if it has not started
+            if copy is not None:
+                copy.cancel()
+            return
+        try:
+            if copy is not None:
+                status.bytes_copied += copy.result()
+            # run the object detector
+            if self.app_config.detect_objects:
+                with self.model_lock:
+                    self.object_detector.detect(destination_path, view)
+        except Exception as e:
+            self._recordFailure(status, the_camera, file, e)
+        else:
+            self._recordSuccess(status)
+
+
+    def _finishFiles(self, pending):
+        """
+        Body of the detection thread started by processFolder.  Finishes the images placed in
+        the pending queue, in order, until it receives None.
+        """
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            # an error must not stop this thread, or processFolder would block on the full queue
+            try:
+                self._finishFile(*item)
+            except Exception as e:
+                logging.error(f"Error finishing {item[2]}: {e}")
+
+
     def generate_html_report(self, noWork=False):
         """
         Generate a simple HTML web page reporting the current status of the copying process.
+        The page is written to a temporary file and then moved into place, so a browser never
+        sees a partially written report.
         Inputs:
             noWork      boolean; if True, all current drives have been processed
         """
-        # boilerplate
-        txt = """<!DOCTYPE html>
-            <html>
-            <head>
-                <title>Trail Camera Autocopy Status</title>
-                <meta http-equiv="refresh" content="10">
-                <style>
-                table, th, td {
-                border: 1px solid black;
-                border-collapse: collapse;
-                }
-                th, td {
-                padding: 15px;
-                }
-                </style>
-            </head>
-            <body>"""
-        txt += "<h1>Trail Camera Autocopy Status</h1>\n"
-        txt +=  f"""<h3>Last update: {self.currentTime().strftime("%H:%M:%S, %m/%d/%Y")}<h3>\n"""
+        parts = [self.HTML_HEAD]
+        parts.append("<h1>Trail Camera Autocopy Status</h1>\n")
+        parts.append(f"""<h3>Last update: {self.currentTime().strftime("%H:%M:%S, %m/%d/%Y")}<h3>\n""")
         if len(self.drive_status) == 0:
-            txt += "<h2>No SD Cards Found</h2>"
+            parts.append("<h2>No SD Cards Found</h2>")
         elif noWork:
              for _, status in self.drive_status.items():  
-                txt += f"""<h3>{status.drive_name}: <progress value="1.0"></progress>100%</h3>\n"""            
+                parts.append(f"""<h3>{status.drive_name}: <progress value="1.0"></progress>100%</h3>\n""")
         else:
             # generate table containing info on each drive 
-            txt += "<table>\n<tr><th></th><th>Drive</th><th>Progress</th><th>Successful Copies</th><th>Failed Copies</th><th>SD Card Used</th><th>SD Files</th></tr>\n"
+            parts.append("<table>\n<tr><th></th><th>Drive</th><th>Progress</th><th>Successful Copies</th><th>Failed Copies</th><th>SD Card Used</th><th>SD Files</th></tr>\n")
             i = 0
             for _, status in self.drive_status.items(): 
                 i += 1                           
                 if status.file_count is None:
-                    txt += f"""<tr><td>{i}</td><td>{status.drive_name}</td><td><progress value="0"></progress>0%</td>"""
-                    txt += f"""<td></td><td></td><td>{int(status.used_space)}%</td></tr>\n"""
+                    parts.append(f"""<tr><td>{i}</td><td>{status.drive_name}</td><td><progress value="0"></progress>0%</td>""")
+                    parts.append(f"""<td></td><td></td><td>{int(status.used_space)}%</td></tr>\n""")
                 else:    
                     if status.file_count > 0:            
-                        fraction = (status.success_count + status.failure_count) / status.file_count
+                        fraction = (status.success_count + status.failure_count + status.skipped_count) / status.file_count
                     else:
                         fraction = 0
                     pct = int(100 * fraction)
-                    txt += "<tr>"
-                    txt += f"<td>{i}</td>\n"
-                    txt += f"<td>{status.drive_name}</td>\n"
-                    txt += f"""<td><progress value="{fraction}"></progress>{pct}%</td>\n"""
-                    txt += f"<td>{status.success_count:,}</td>\n"
-                    txt += f"<td>{status.failure_count:,}</td>\n"
-                    txt += f"<td>{int(status.used_space)}%</td>\n"
-                    txt += f"<td>{status.file_count:,}</td>\n"
-                    txt += "</tr>"
-            txt += "</table>\n"
+                    parts.append(
+                        f"<tr><td>{i}</td>\n"
+                        f"<td>{status.drive_name}</td>\n"
+                        f"""<td><progress value="{fraction}"></progress>{pct}%</td>\n"""
+                        f"<td>{status.success_count:,}</td>\n"
+                        f"<td>{status.failure_count:,}</td>\n"
+                        f"<td>{int(status.used_space)}%</td>\n"
+                        f"<td>{status.file_count:,}</td>\n</tr>"
+                    )
+            parts.append("</table>\n")
         # error strings, if any
         if len(self.errors) > 0:
-            txt += "<h1>Recent Errors</h1>\n"
+            parts.append("<h1>Recent Errors</h1>\n")
             for err in self.errors:
-                txt += f"<p><pre>{err}</pre></p>\n"
-        txt += "</body>"
-        with open(self.app_config.html_report, "w") as f:
-            f.write(txt)
+                parts.append(f"<p><pre>{err}</pre></p>\n")
+        parts.append("</body>")
+        tempFilename = self.app_config.html_report + ".tmp"
+        with open(tempFilename, "w") as f:
+            f.write("".join(parts))
+        os.replace(tempFilename, self.app_config.html_report)
+        self.last_html_report = time.monotonic()
  
 
     def getConfigFilename(self):
@@ -319,6 +406,9 @@ class AutoCopy:
         logging.basicConfig(filename=self.app_config.error_log_file, 
             filemode="a", level=logging.DEBUG, format='%(asctime)s - %(message)s')    
 
+        # forget the destination folders seen on earlier SD cards, in case they were removed
+        self.created_folders.clear()
+
         try:        
             # get the DriveStatus object associated with this source
             if source in self.drive_status:
@@ -327,15 +417,17 @@ class AutoCopy:
                 status = DriveStatus(source, source, 0)
 
             # initialize status variables
+            status.bytes_copied = 0
             status.success_count = 0
             status.failure_count = 0
+            status.skipped_count = 0
             status.files = trailcamutils.getFilePathsInSubfolders(source)
             status.file_count = len(status.files)
 
             # iterate over all the files in the input directory
             the_camera = self.processFolder(status)
 
-            logging.info(f"Camera {the_camera}: failed copies = {status.failure_count}, successful copies = {status.success_count}")
+            logging.info(f"Camera {the_camera}: failed copies = {status.failure_count}, successful copies = {status.success_count}, bytes copied = {status.bytes_copied:,}")
             if self.abort:
                 logging.info("Autocopy aborted")   
 
@@ -343,79 +435,132 @@ class AutoCopy:
             logging.error(f"Error in main: {e}")
 
 
+    def _makeFolder(self, folder):
+        """
+        Creates the specified folder and any missing parents, unless it has already been
+        created or found by this object.
+        """
+        if folder not in self.created_folders:
+            os.makedirs(folder, exist_ok=True)
+            self.created_folders.add(folder)
+
+
     def processFolder(self, status):
         """
-        Process all of the images in the provided status object.
+        Process all of the images in the provided status object.  The work is split into a
+        pipeline: this thread reads the metadata of OCR_BATCH_SIZE images at a time, worker 
+        threads copy the images, and a detection thread waits for each copy and runs the object 
+        detector.  Up to COPY_QUEUE_DEPTH images can be between the first and last stages.
         Returns the camera ID for images in the folder.
         """
         if self.create_html:
-            self.generate_html_report()
-
-        the_camera = app.app_config.camera_id
+            with self.status_lock:
+                self.generate_html_report()
+
+        # settings used for every image
+        config = self.app_config
+        camera_model = config.camera_model
+        copy_images = config.copy_images
+        images_destination = config.images_destination
+        prefix = config.prefix
+        use_exif = config.use_exif
+        views = config.views
+        the_camera = config.camera_id
 
         file_count = len(status.files)
-        for i in range(file_count):
-            try:                
-                if self.abort:
-                    return the_camera
-
-                # skip processing the first skip_start files and the last skip_end files, to avoid 
-                # copying images that may have the field workers in them
-                if (self.app_config.skip_start <= i < file_count - self.app_config.skip_end):
-                    file = status.files[i]
-                    _, ext = os.path.splitext(file)
-
-                    if self.app_config.use_exif:
-                        # get EXIF date & time for image
-                        exif_data = trailcamutils.getExifData(file)
-                        if exif_data is not None:
-                            exif_date, exif_time = exif_data
-                            # create a file name for the image
-                            filename = trailcamutils.createImageFilename(self.app_config.prefix, the_camera, exif_date, exif_time, ext, self.app_config.views)
-
-                    else: 
-                        # extract the image metadata from the image using OCR                             
-                        the_camera, view, ocr_date, ocr_time = self.ocr.extractImageInfo(file, self.app_config.views, self.app_config.camera_model)
-                        # create a file name for the image
-                        filename = trailcamutils.createImageFilename(self.app_config.prefix, the_camera, ocr_date, ocr_time, ext, self.app_config.views)
-
-                    # create a pathname for the destination image
-                    destination_path = os.path.join(
-                        self.app_config.images_destination,
-                        trailcamutils.imagePathFromFilename(filename, self.app_config.prefix, self.app_config.views)
-                    )
-                    # ensure the destination path exists
-                    os.makedirs(destination_path, exist_ok=True)
-                    destination_path = os.path.join(destination_path, filename)                    
-
-                    # copy the image to the destination folder
-                    if self.app_config.copy_images:
-                        shutil.copyfile(file, destination_path)
-
-                    # run the object detector
-                    if self.app_config.detect_objects:
-                        self.object_detector.detect(destination_path, view)
-
-                            
-            except Exception as e:
-                logging.warning(f"Camera {the_camera} - Copy failed on {file}: {e}")
-                self.errors.append(f"{e}")
-                status.failure_count += 1
-            else:
-                status.success_count += 1
-
-            if self.create_html and (status.failure_count + status.success_count) % 100 == 0:
-                self.generate_html_report()                                        
+        # skip processing the first skip_start files and the last skip_end files, to avoid 
+        # copying images that may have the field workers in them
+        first = min(config.skip_start, file_count)              # index of first file to process
+        last = max(first, file_count - config.skip_end)         # index after the last file to process
+        status.skipped_count = file_count - (last - first)
+        destination_folders = {}                                # destination folder for each camera and date
+        pending = queue.Queue(maxsize=self.COPY_QUEUE_DEPTH)    # images waiting for detection; arguments for _finishFile
+        finisher = threading.Thread(target=self._finishFiles, args=(pending,), daemon=True)
+        finisher.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.copy_workers) as copier:
+                files = status.files[first:last]
+                for start in range(0, len(files), self.OCR_BATCH_SIZE):
+                    if self.abort:
+                        break
+                    batch = files[start:start + self.OCR_BATCH_SIZE]
+                    if not use_exif:
+                        try:
+                            # read each image once; the same bytes are decoded for OCR and written to the
+                            # destination, so the SD card is not read a second time for the copy
+                            contents = [self._readImage(file) for file in batch]
+                            # extract the image metadata from the batch of images using OCR
+                            with self.model_lock:
+                                batch_info = self.ocr.extractImageInfoBatch(batch, views, camera_model, contents)
+                        except Exception as e:
+                            # an error affecting the whole batch fails each of its images
+                            batch_info = [e] * len(batch)
+
+                    for j, file in enumerate(batch):
+                        try:                
+                            # the file list only holds names ending in the image extension, so the
+                            # last period in the path starts the extension
+                            ext = "." + file.rpartition(".")[2]
+                            view = None
+
+                            if use_exif:
+                                # get EXIF date & time for image
+                                exif_data = trailcamutils.getExifData(file)
+                                if exif_data is not None:
+                                    exif_date, exif_time = exif_data
+                                    # create a file name for the image
+                                    filename = trailcamutils.createImageFilename(prefix, the_camera, exif_date, exif_time, ext, views)
+
+                            else: 
+                                # get the image metadata extracted by OCR
+                                info = batch_info[j]
+                                if isinstance(info, Exception):
+                                    raise info
+                                the_camera, view, ocr_date, ocr_time = info
+                                # create a file name for the image
+                                filename = trailcamutils.createImageFilename(prefix, the_camera, ocr_date, ocr_time, ext, views)
+
+                            # create a pathname for the destination image; the folder depends only on the
+                            # camera and date at the front of the filename, which repeat for many images
+                            folder_key = filename.rpartition("-")[0]
+                            destination_folder = destination_folders.get(folder_key)
+                            if destination_folder is None:
+                                destination_folder = os.path.join(
+                                    images_destination,
+                                    trailcamutils.imagePathFromFilename(filename, prefix, views)
+                                )
+                                # ensure the destination path exists
+                                self._makeFolder(destination_folder)
+                                destination_folders[folder_key] = destination_folder
+                            destination_path = os.path.join(destination_folder, filename)                    
+
+                            # start copying the image to the destination folder
+                            copy = None
+                            if copy_images:
+                                copy = copier.submit(self._copyImage, file, None if use_exif else contents[j], destination_path)
+                            pending.put((status, the_camera, file, copy, destination_path, view))
+
+                        except Exception as e:
+                            self._recordFailure(status, the_camera, file, e)
+        finally:
+            # wait for the detection thread to finish the remaining images
+            pending.put(None)
+            finisher.join()
 
         if self.create_html:
-            self.generate_html_report()
+            with self.status_lock:
+                self.generate_html_report()
 
         return the_camera
 
 
     def processSdCards(self):
         """
-        Processes all of the SD cards found on the system
+        Processes all of the SD cards found on the system.  Each SD card is processed on its
+        own thread, so cards on different USB ports are copied at the same time.  Within a card,
+        the drive thread reads the images for OCR or EXIF while copy threads write them to the
+        destination; with more than one card, each card gets a single copy thread, so no card
+        has more than two threads reading it at once.
         """
         drives = self.initializeDriveStatus()
 
@@ -423,10 +568,70 @@ class AutoCopy:
         self.generate_html_report()
 
         # process each drive
-        for drive, volume_name, _ in drives:
-            if self.abort:
-                return
-            self.main(drive)
+        if len(drives) == 0:
+            return
+        self.copy_workers = self.COPY_WORKERS if len(drives) == 1 else 1
+        with ThreadPoolExecutor(max_workers=len(drives)) as executor:
+            for drive, volume_name, _ in drives:
+                if self.abort:
+                    break
+                executor.submit(self.main, drive)
+
+
+    def _readImage(self, file):
+        """
+        Returns the contents of an image file, or None if the file could not be read; OCR
+        will then report the error when it tries to read the file itself.
+        """
+        try:
+            with open(file, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+    def _recordFailure(self, status, the_camera, file, error):
+        """
+        Logs an image that could not be processed and counts it as a failure.
+        """
+        logging.warning(f"Camera {the_camera} - Copy failed on {file}: {error}")
+        with self.status_lock:
+            self.errors.append(f"{error}")
+            status.failure_count += 1
+            self._reportProgress(status)
+
+
+    def _recordSuccess(self, status):
+        """
+        Counts an image as successfully processed.
+        """
+        with self.status_lock:
+            status.success_count += 1
+            self._reportProgress(status)
+
+
+    def _reportProgress(self, status):
+        """
+        Regenerates the HTML report after every 100 images processed, but no more often than
+        once every HTML_REPORT_INTERVAL seconds.
+        """
+        if (self.create_html and (status.failure_count + status.success_count) % 100 == 0 and
+            time.monotonic() - self.last_html_report >= self.HTML_REPORT_INTERVAL):
+            try:
+                self.generate_html_report()
+            except OSError as e:
+                # e.g., a browser has the page open on Windows; the next update will try again
+                logging.warning(f"Unable to update HTML report: {e}")
+
+
+    def _writeImage(self, data, destination_path):
+        """
+        Writes the contents of an image to the destination file.
+        Returns the number of bytes written.
+        """
+        with open(destination_path, "wb") as f:
+            f.write(data)
+        return len(data)
 
 
 def parseCommandLine():
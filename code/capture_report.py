@@ -18,12 +18,15 @@ can be provided in a configuration file.
 
 # standard Python modules
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import configparser
 import os
 
 # modules that are part of this package
 import utils.trailcamutils as trailcamutils
 
+READ_BLOCK_SIZE = 1 << 16               # number of bytes read at a time when counting lines
+
 
 class AppConfig:
     """ 
@@ -57,6 +60,8 @@ class AppConfig:
 
 
 class CaptureReport:
+    FRAME_COUNT_WORKERS = 8         # number of threads reading video frame index files
+
     def __init__(self, configFile=None):
         if configFile is None:
             configFile = self.getConfigFilename()
@@ -72,9 +77,15 @@ class CaptureReport:
         indexFile = os.path.splitext(videoFile)[0] + ".index"
         # read the contents of the index file
         if os.path.exists(indexFile):
-            with open(indexFile, "r") as inFile:
-                # get number of lines in the file
-                frames = len(inFile.readlines())
+            with open(indexFile, "rb") as inFile:
+                # get number of lines in the file by counting newlines in fixed-size blocks
+                last = b"\n"
+                for block in iter(lambda: inFile.read(READ_BLOCK_SIZE), b""):
+                    frames += block.count(b"\n")
+                    last = block[-1:]
+                # count a final line that is not terminated by a newline
+                if last != b"\n":
+                    frames += 1
         return frames
 
 
@@ -94,86 +105,88 @@ class CaptureReport:
                         If not provided, the report is created for the entire period of time
                         data has been recorded.
         """
-        videoDict, frameCntDict = self.tallyVideos(self.app_config.video_folder, month)    
-        annotationDict = self.tallyAnnotations(self.app_config.annotation_folder)
-        imageDict = self.tallyImages(self.app_config.image_folder)
+        # the video, annotation, and image folders are scanned at the same time
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            videos = executor.submit(self.tallyVideos, self.app_config.video_folder, month)
+            annotations = executor.submit(self.tallyAnnotations, self.app_config.annotation_folder, month)
+            images = executor.submit(self.tallyImages, self.app_config.image_folder, month)
+            videoDict, frameCntDict = videos.result()
+            annotationDict = annotations.result()
+            imageDict = images.result()
         self.writeReport(annotationDict, imageDict, frameCntDict, videoDict, month)
 
 
-    def tallyAnnotations(self, annotationFolder):
+    def tallyAnnotations(self, annotationFolder, month=None):
         """
-        Returns a dictionary recording the annotated video dates for each camera.
+        Returns a dictionary recording the set of annotated video dates for each camera.
+        If month is provided, only dates in that month are recorded.
         """
-        files = trailcamutils.getFilenamesInFolder(annotationFolder, extension=".annotations")   
+        files = trailcamutils.getFilenamesInFolder(annotationFolder, ".annotations")   
         cameraDict = {}
         for f in files:
             camera, date = trailcamutils.splitAnnotationFilename(f)
             if camera is not None:
-                if camera in cameraDict:
-                    cameraDict[camera].append(date)
-                else:
-                    cameraDict[camera] = [date]
+                # if this annotation does not belong to the month of interest, skip it
+                if (month is not None) and (not date.startswith(month)):
+                    continue
+                cameraDict.setdefault(camera, set()).add(date)
         return cameraDict
 
 
-    def tallyImages(self, rawImageFolder):
+    def tallyImages(self, rawImageFolder, month=None):
         """
         Returns a dictionary of dictionaries recording the number
-        of images taken each day by each camera.
+        of images taken each day by each camera.  If month is provided, 
+        only images taken in that month are counted.
         """
         # tally the files taken each day
         cameraDict = {}     # dictionary of info about each camera   
-        files = trailcamutils.getFilePathsInSubfolders(rawImageFolder)     
+        files = trailcamutils.getFilePathsInSubfolders(rawImageFolder, ".jpg")     
+        prefix = self.app_config.prefix
+        views = self.app_config.views
         for f in files:
-            _, cameraID, view, date, _  = trailcamutils.splitImageFilename(f, self.app_config.prefix, self.app_config.views)            
-            camera = self.app_config.prefix + cameraID + view
-
-            # get the date dictionary associated with this camera
-            if camera in cameraDict:
-                dateDict = cameraDict[camera]
-            else:
-                dateDict = {}
-                cameraDict[camera] = dateDict
-
-            # increment the images taken on this date
-            if date in dateDict:
-                dateDict[date] += 1
-            else:
-                dateDict[date] = 1
+            _, cameraID, view, date, _  = trailcamutils.splitImageFilename(f, prefix, views)            
+            # if this image does not belong to the month of interest, skip it
+            if (month is not None) and (not date.startswith(month)):
+                continue
+            camera = prefix + cameraID + view
+
+            # increment the images taken on this date by this camera
+            dateDict = cameraDict.setdefault(camera, {})
+            dateDict[date] = dateDict.get(date, 0) + 1
         return cameraDict
 
 
     def tallyVideos(self, videoFolder, month):
         """
-        Returns a dictionary recording the videos taken by each camera.
+        Returns a dictionary recording the set of video dates for each camera, and a dictionary
+        of dictionaries recording the number of frames in each video.
         """
-        files = trailcamutils.getFilePathsInSubfolders(videoFolder, extension=".mp4")   
+        files = trailcamutils.getFilePathsInSubfolders(videoFolder, ".mp4")   
         cameraDict = {}
         frameCntDict = {}
+        videos = []         # (camera, date, path) for each video in the report
+        prefix = self.app_config.prefix
+        views = self.app_config.views
         for f in files:
-            siteID, viewAbbrev, date = trailcamutils.splitVideoFilename(f, self.app_config.prefix, self.app_config.views)
+            siteID, viewAbbrev, date = trailcamutils.splitVideoFilename(f, prefix, views)
             if siteID is not None:
                 # if this video does not belong to the month of interest, skip it
                 if (month is not None) and (not date.startswith(month)):
                     continue
 
-                camera = self.app_config.prefix + siteID + viewAbbrev
+                camera = prefix + siteID + viewAbbrev
 
                 # add video to cameraDict
-                if camera in cameraDict:
-                    cameraDict[camera].append(date)
-                else:
-                    cameraDict[camera] = [date]
-
-                # get the frameCnt date dictionary associated with this camera
-                if camera in frameCntDict:
-                    dateDict = frameCntDict[camera]
-                else:
-                    dateDict = {}
-                    frameCntDict[camera] = dateDict
+                cameraDict.setdefault(camera, set()).add(date)
+                videos.append((camera, date, f))
 
-                # add number of frames to frameCnt date dictionary
-                dateDict[date] = self.countFrames(f)
+        # read the frame index files in parallel, since the time is spent waiting on the disk
+        with ThreadPoolExecutor(max_workers=self.FRAME_COUNT_WORKERS) as executor:
+            frameCounts = executor.map(self.countFrames, [f for _, _, f in videos])
+            # add number of frames to the frameCnt date dictionary associated with each camera
+            for (camera, date, _), frameCnt in zip(videos, frameCounts):
+                frameCntDict.setdefault(camera, {})[date] = frameCnt
 
         return cameraDict, frameCntDict
 
@@ -185,49 +198,36 @@ class CaptureReport:
         else:
             filename = f"capture_report_{month}.csv"
 
+        # build the rows of the report, then write them all at once
+        rows = ["Camera, Date, ImageCount, FrameCount, Video, Annotation\n"]
+
+        # sort camera names
+        cameras = sorted(videoDict.keys() | imageDict.keys())
+
+        for camera in cameras:
+            # get the information recorded for this camera; annotation files are named without the view
+            videoDates = videoDict.get(camera, set())
+            imageCounts = imageDict.get(camera, {})
+            frameCounts = frameCntDict.get(camera, {})
+            annotationDates = annotationDict.get(camera[:-1], set())
+
+            # sort the dates for this camera; the tallies only hold dates in the month of interest
+            dates = sorted(videoDates | imageCounts.keys())
+
+            for date in dates:
+                # check if a video exists for this date
+                videoExists = date in videoDates
+                # check if an annotation file exists for this date
+                annotExists = date in annotationDates
+                # get image count for this date
+                imageCnt = imageCounts.get(date, 0)
+                # get frame count for this date
+                frameCnt = frameCounts.get(date, 0)
+
+                rows.append(f"{camera}, {date}, {imageCnt}, {frameCnt}, {videoExists}, {annotExists}\n")
+
         with open(filename, "w") as reportFile:
-            reportFile.write("Camera, Date, ImageCount, FrameCount, Video, Annotation\n")
-
-            # sort camera names
-            cameras = set(videoDict.keys())
-            cameras.update(set(imageDict.keys()))
-            cameras = list(cameras)
-            cameras.sort()
-
-            for camera in cameras:
-                # sort the dates for this camera
-                dates = set()
-                if camera in videoDict:
-                    dates.update(set(videoDict[camera]))
-                if camera in imageDict:
-                    dates.update(set(imageDict[camera].keys()))
-                dates = list(dates)
-                dates.sort()
-
-                for date in dates:
-                    if (month is None) or date.startswith(month):
-                        # check if a video exists for this date
-                        videoExists = False
-                        if camera in videoDict:
-                            if date in videoDict[camera]:
-                                videoExists = True
-                        # check if an annotation file exists for this date
-                        annotExists = False
-                        if camera[:-1] in annotationDict:
-                            if date in annotationDict[camera[:-1]]:
-                                annotExists = True
-                        # get image count for this date
-                        imageCnt = 0
-                        if camera in imageDict:
-                            if date in imageDict[camera]:
-                                imageCnt = imageDict[camera][date]
-                        # get frame count for this date
-                        frameCnt = 0
-                        if camera in frameCntDict:
-                            if date in frameCntDict[camera]:
-                                frameCnt = frameCntDict[camera][date]
-
-                        reportFile.write(f"{camera}, {date}, {imageCnt}, {frameCnt}, {videoExists}, {annotExists}\n")
+            reportFile.write("".join(rows))
 
 
 
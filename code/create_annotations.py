@@ -10,11 +10,16 @@ and creates a draft video segmentation for use by the annotator app.
 # standard Python modules
 import argparse
 import configparser
+import csv
 import os
+import re
 
 # modules that are part of this package
 import utils.trailcamutils as trailcamutils
 
+NONBLANK_LINE = re.compile(rb"\S[^\n]*")     # matches the text of a non-blank line, from its first non-space character
+READ_BUFFER_SIZE = 1 << 20                  # size of the buffer used to read the detection log
+
 
 class AppConfig:
     """ 
@@ -62,6 +67,7 @@ class AnnotationCreator:
         if configFile is None:
             configFile = self.getConfigFilename()
         self.app_config = AppConfig(configFile)
+        self.timelines = {}         # maps image folder to the (filenames, filename indices, datetimes) returned by _getTimeline
 
 
     def createAnnotationFiles(self, detections):
@@ -70,6 +76,10 @@ class AnnotationCreator:
         Input:
             detections      dictionary produced by the ReadDetectionsLogFile method
         """
+        prefix = self.app_config.prefix
+        views = self.app_config.views
+        threshold = self.app_config.sequence_break_threshold
+
         # iterate through the detections dictionary
         for _, dates in detections.items():
             for date, detection_files in dates.items():                
@@ -79,11 +89,11 @@ class AnnotationCreator:
                 # get a list of all the image files for this camera on this date
                 images_path = os.path.join(
                     self.app_config.image_folder, 
-                    trailcamutils.imagePathFromFilename(detection_files[0][0], self.app_config.prefix, self.app_config.views)
+                    trailcamutils.imagePathFromFilename(detection_files[0][0], prefix, views)
                     )
                 if not os.path.exists(images_path):
                     continue
-                all_files = trailcamutils.getFilenamesInFolder(images_path)
+                all_files, file_indices, all_datetimes = self._getTimeline(images_path)
                 
                 # iterate across all the detection files, looking for contiguous sequences of files
                 startIdx = -1
@@ -91,7 +101,7 @@ class AnnotationCreator:
                 prevCount = 0
                 for det_file, count in detection_files:
                     # get the index of det_file in the timeline for this date
-                    idx = all_files.index(os.path.basename(det_file))
+                    idx = file_indices[os.path.basename(det_file)]
 
                     if startIdx == -1:
                         # this marks the start of a new segment
@@ -99,10 +109,10 @@ class AnnotationCreator:
                         prevIdx = idx
                         prevCount = 0
 
-                    if (idx - prevIdx > self.app_config.sequence_break_threshold) or ((prevCount > 0) and (count != prevCount)):
+                    if (idx - prevIdx > threshold) or ((prevCount > 0) and (count != prevCount)):
                         # there is a break in the sequence, so create an annotation entry
-                        start_datetime = trailcamutils.datetimeFromImageFilename(all_files[startIdx], self.app_config.prefix, self.app_config.views)
-                        end_datetime = trailcamutils.datetimeFromImageFilename(all_files[prevIdx], self.app_config.prefix, self.app_config.views)
+                        start_datetime = all_datetimes[startIdx]
+                        end_datetime = all_datetimes[prevIdx]
                         if prevCount > 1:
                             activity = "> 1"
                         else:
@@ -118,8 +128,8 @@ class AnnotationCreator:
 
                 # final segment
                 if startIdx != -1:
-                    start_datetime = trailcamutils.datetimeFromImageFilename(all_files[startIdx], self.app_config.prefix, self.app_config.views)
-                    end_datetime = trailcamutils.datetimeFromImageFilename(all_files[idx], self.app_config.prefix, self.app_config.views)
+                    start_datetime = all_datetimes[startIdx]
+                    end_datetime = all_datetimes[idx]
                     if count > 1:
                         activity = "> 1"
                     else:
@@ -127,8 +137,8 @@ class AnnotationCreator:
                     annotations.append((activity, 'AI_count', 'AI_count', start_datetime, end_datetime, 'AI'))
                    
                 # write out the annotation file
-                _, site_ID, _, date, _ = trailcamutils.splitImageFilename(detection_files[0][0], self.app_config.prefix, self.app_config.views)
-                self.writeAnnotationFile(annotations, trailcamutils.createAnnotationFilename(site_ID, date, self.app_config.prefix))
+                _, site_ID, _, date, _ = trailcamutils.splitImageFilename(detection_files[0][0], prefix, views)
+                self.writeAnnotationFile(annotations, trailcamutils.createAnnotationFilename(site_ID, date, prefix))
 
 
     def getConfigFilename(self):
@@ -139,6 +149,34 @@ class AnnotationCreator:
         return base + ".config"
 
 
+    def _getTimeline(self, images_path):
+        """
+        Returns the timeline of images in a folder.  Each folder is only scanned once.
+        Input:
+            images_path     string; path to a folder of images for one camera on one date
+        Returns:
+            A tuple of the form (sorted list of filenames, dictionary mapping each filename to
+            its index in the list, list of the datetime of each file); the datetime is None
+            for a file whose name is not a trail camera image filename
+        """
+        if images_path not in self.timelines:
+            prefix = self.app_config.prefix
+            views = self.app_config.views
+            all_files = trailcamutils.getFilenamesInFolder(images_path)
+            # map each filename to its index in the timeline
+            file_indices = {name: i for i, name in enumerate(all_files)}
+            # the datetime of each file in the timeline; stray files, such as thumbnails or renamed
+            # copies, keep their place in the timeline but are never the start or end of a detection
+            all_datetimes = []
+            for name in all_files:
+                try:
+                    all_datetimes.append(trailcamutils.datetimeFromImageFilename(name, prefix, views))
+                except (IndexError, ValueError):
+                    all_datetimes.append(None)
+            self.timelines[images_path] = (all_files, file_indices, all_datetimes)
+        return self.timelines[images_path]
+
+
     def processDetectionLog(self):
         """
         Main driver for the CreateAnnotations class.  Processes the detection log, creating
@@ -157,25 +195,19 @@ class AnnotationCreator:
         """
         # read the log file and segregate contents by camera and date
         master_dict = {}
-        with open(self.app_config.detection_log_file, "r") as f:
-            for line in f:
-                line = line.strip()
-                if len(line) > 0:
-                    parts = line.split(',')
-                    filename = parts[0]
-                    count = int(parts[1].strip())
-                    camera, _, _, date, _ = trailcamutils.splitImageFilename(filename, self.app_config.prefix, self.app_config.views)
-                    # get the dictionary item for the camera
-                    if camera in master_dict:
-                        camera_dict = master_dict[camera]
-                    else:
-                        camera_dict = {}
-                        master_dict[camera] = camera_dict
-                    # get the dictionary item for the date
-                    if date in camera_dict:
-                        camera_dict[date].append((filename, count))
-                    else:
-                        camera_dict[date] = [(filename, count)]
+        prefix = self.app_config.prefix
+        views = self.app_config.views
+        with open(self.app_config.detection_log_file, "r", buffering=READ_BUFFER_SIZE, newline="") as f:
+            # each line has the form "<image path>, <object count>"
+            for parts in csv.reader(f, skipinitialspace=True):
+                if len(parts) < 2:
+                    # skip blank lines
+                    continue
+                filename = parts[0]
+                count = int(parts[1])
+                camera, _, _, date, _ = trailcamutils.splitImageFilename(filename, prefix, views)
+                # add the file to the list for this camera and date
+                master_dict.setdefault(camera, {}).setdefault(date, []).append((filename, count))
 
         # sort the filenames
         for camera, dates in master_dict.items():
@@ -193,28 +225,18 @@ class AnnotationCreator:
         """        
         boxFiles = trailcamutils.getFilePathsInSubfolders(boxFolder, ".boxes")
         master_dict = {}
+        prefix = self.app_config.prefix
+        views = self.app_config.views
         for file in boxFiles:
-            # count the number of boxes in file
-            count = 0
-            with open(file, "r") as f:
-                for aLine in f:
-                    if len(aLine.strip()) > 0:
-                        count += 1
+            # count the number of boxes in file, one per non-blank line
+            with open(file, "rb") as f:
+                count = len(NONBLANK_LINE.findall(f.read()))
 
             if count > 0:
                 filename = os.path.splitext(os.path.basename(file))[0] + ".JPG"
-                camera, _, _, date, _ = trailcamutils.splitImageFilename(filename, self.app_config.prefix, self.app_config.views)
-                # get the dictionary item for the camera
-                if camera in master_dict:
-                    camera_dict = master_dict[camera]
-                else:
-                    camera_dict = {}
-                    master_dict[camera] = camera_dict
-                # get the dictionary item for the date
-                if date in camera_dict:
-                    camera_dict[date].append((filename, count))
-                else:
-                    camera_dict[date] = [(filename, count)]
+                camera, _, _, date, _ = trailcamutils.splitImageFilename(filename, prefix, views)
+                # add the file to the list for this camera and date
+                master_dict.setdefault(camera, {}).setdefault(date, []).append((filename, count))
 
         # sort the filenames
         for camera, dates in master_dict.items():
@@ -231,9 +253,10 @@ class AnnotationCreator:
         filename = os.path.join(self.app_config.annotation_folder, filename)
         specifier = "a" if self.app_config.append_annotations else "w"
 
+        # format all the annotations, then write them at once
+        lines = [f"{a[0]}, {a[1]}, {a[2]}, {a[3]}, {a[4]}, {a[5]}\n" for a in annotations]
         with open(filename, specifier) as f:
-            for a in annotations:
-                f.write(f"{a[0]}, {a[1]}, {a[2]}, {a[3]}, {a[4]}, {a[5]}\n")
+            f.write("".join(lines))
 
 
 
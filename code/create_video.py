@@ -30,17 +30,22 @@ can be provided in a configuration file.
 
 # standard Python modules
 import argparse
+import concurrent.futures
 import configparser
 import datetime
 import functools
 import operator
 import os
+import queue
+import struct
+import subprocess
 import sys
+import tempfile
+import threading
 
 # 3rd party modules
 import numpy as np
 import cv2
-from PIL import Image
 
 # modules that are part of this package
 import utils.trailcamutils as trailcamutils
@@ -75,7 +80,7 @@ class AppConfig:
         self.force = bool(int(settings.get("force", 0)))                    # force the creation of video files, even if one of the same name already exists
         self.image_extension = settings.get("image_extension", "JPG")       # file extension of source images
         self.max_interval = float(settings.get("max_interval", 3))          # maximum time interval (in seconds) allowed when time-aligning composite image frames
-        self.recompress = bool(int(settings.get("recompress_composite", 1)))  # recompress the videos using FFMPEG for maximum compression
+        self.workers = int(settings.get("workers", 0))                      # number of days processed in parallel; 0 = half the number of CPU cores
 
         # camera viewpoint names
         settings = self.app_config["Camera_Views"]
@@ -103,29 +108,85 @@ class AppConfig:
 
 
 class ComposeVideo:
-    COMPRESSOR = "mp4v"
+    FRAME_QUEUE_SIZE = 8            # maximum number of composited frames waiting to be encoded
+    IMREAD_FLAGS = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION   # load images as stored, ignoring EXIF orientation as PIL did
+    PIPE_BUFFER_SIZE = 1 << 20      # size (in bytes) of the buffer for writing frames to ffmpeg
 
     def __init__(self, configFile=None):
         if configFile is None:
             configFile = self.getConfigFilename()
+        self.config_file = configFile       # path to the configuration file
         self.app_config = AppConfig(configFile)
+        self.ffmpeg_threads = 0             # number of threads each ffmpeg encode may use; 0 lets ffmpeg decide
+        self.show_progress = True           # indicates if progress dots are printed while frames are composited
 
-    def concatImages(self, image1, image2, scale):
+    def _buildSchedule(self, view1Files, view2Files, maxInterval):
+        """
+        Time-aligns the images of two views without opening any of them.  Each frame takes the earlier of
+        the next images of the two views, along with the next image of the other view if it is within
+        maxInterval seconds of the first.
+        Inputs:
+            view1Files              list; time-sorted (datetime, path) pairs of the left view images
+            view2Files              list; time-sorted (datetime, path) pairs of the right view images
+            maxInterval             float; maximum time difference (in seconds) between paired images
+        Returns:
+            A list of (frameTime, view1 path, view2 path, primary) records, one per frame.  A path is
+            None when the frame has no new image for that view.  primary is the index (0 for view1,
+            1 for view2) of the view whose image sets the frame's time.
+        """
+        schedule = []
+        i1 = 0              # index of the next view1 file
+        i2 = 0              # index of the next view2 file
+        while (i2 < len(view2Files)) or (i1 < len(view1Files)):
+            path1 = None
+            path2 = None
+            if (i2 >= len(view2Files)) or ((i1 < len(view1Files)) and (view1Files[i1][0] < view2Files[i2][0])):
+                # time of view1 file is earlier
+                f = view1Files[i1]
+                i1 += 1
+                path1 = f[1]
+                primary = 0
+                # check if the next view2 file is close enough for a match
+                if (i2 < len(view2Files)) and (abs((view2Files[i2][0] - f[0]).total_seconds()) < maxInterval):
+                    path2 = view2Files[i2][1]
+                    i2 += 1
+            else:
+                # time of view2 file is earlier
+                f = view2Files[i2]
+                i2 += 1
+                path2 = f[1]
+                primary = 1
+                # check if the next view1 file is close enough for a match
+                if (i1 < len(view1Files)) and (abs((view1Files[i1][0] - f[0]).total_seconds()) < maxInterval):
+                    path1 = view1Files[i1][1]
+                    i1 += 1
+            frameTime = trailcamutils.datetimeFromImageFilename(f[1], self.app_config.prefix, self.app_config.views)
+            schedule.append((frameTime, path1, path2, primary))
+        return schedule
+
+    def concatImages(self, image1, image2, scale, canvas):
         """
         Returns a cv2 (numpy) image that is the horizontal concatenation of scaled versions of image1 and image2.
+        The scaled images are written directly into canvas, which is reused from frame to frame; a new
+        canvas is allocated only if its shape does not match the concatenated image.
+        Inputs:
+            image1                  numpy array; BGR image placed on the left
+            image2                  numpy array; BGR image placed on the right
+            scale                   float; image scaling factor
+            canvas                  numpy array; BGR image that receives the concatenated images
         """
         # scale the image sizes
-        w1 = int(image1.width * scale)
-        h1 = int(image1.height * scale)
-        w2 = int(image2.width * scale)
-        # use PIL to concatenate the images
-        videoWidth = w1 + w2 + 10
-        cat = Image.new("RGB", (videoWidth, int(image1.height * scale)))
-        cat.paste(image1.resize((w1, h1)))
-        cat.paste(image2.resize((w2, h1)), (w1 + 10, 0))
-        # convert the PIL image into a cv2 image
-        opencvImage = cv2.cvtColor(np.array(cat), cv2.COLOR_RGB2BGR)
-        return opencvImage
+        w1 = int(image1.shape[1] * scale)
+        h1 = int(image1.shape[0] * scale)
+        w2 = int(image2.shape[1] * scale)
+        if canvas.shape != (h1, w1 + w2 + 10, 3):
+            canvas = np.zeros((h1, w1 + w2 + 10, 3), dtype=np.uint8)
+        # area interpolation gives the best quality when shrinking
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        # resize the images into their slices of the canvas; the 10 pixel gap between them stays black
+        cv2.resize(image1, (w1, h1), dst=canvas[:, :w1], interpolation=interpolation)
+        cv2.resize(image2, (w2, h1), dst=canvas[:, w1 + 10:], interpolation=interpolation)
+        return canvas
 
     def createVideo(self, day, sourceFolder, destinationFolder, imageExtension, siteID):
         """
@@ -153,26 +214,16 @@ class ComposeVideo:
             outputFilename = os.path.join(destinationFolder, trailcamutils.videoFilenameFromParts(siteID, day, "composite", "mp4"))
             indexFilename = os.path.join(destinationFolder, trailcamutils.videoFilenameFromParts(siteID, day, "composite", "index"))
 
-            if not self.app_config.recompress:
-                tempFile = outputFilename
-            else:
-                # The cv2 video writer does not do a very good job compressing the video, so it is first
-                # created to a temporary file, which will later be compressed by ffmpeg
-                tempFile = os.path.join(destinationFolder, "temporary.mp4")
             if self.app_config.force or (not os.path.exists(outputFilename)):
                 print("Creating " + outputFilename)
                 self.imagesPlusImagesCompose(
                     view1_ImageDir,
                     view2_ImageDir,
-                    tempFile,
+                    outputFilename,
                     imageExtension,
                     indexFilename
                 )
                 print()
-                # compress the video using ffmpeg
-                if self.app_config.recompress and os.path.exists(tempFile):
-                    os.system(f'ffmpeg -loglevel error -y -i "{tempFile}" -b:v 30M "{outputFilename}"')
-                    os.remove(tempFile)
 
         # make a video for each view
         for key, val in self.app_config.views.items():
@@ -195,13 +246,104 @@ class ComposeVideo:
                     )
                     print()
 
-    def createVideoWriter(self, filename, fourccType, width, height):
+    def createVideoPipe(self, filename, width, height, errorFile):
+        """
+        Returns an ffmpeg process that encodes the raw BGR frames written to its stdin into a video file.
+        Inputs:
+            filename                string; path of the video file to create
+            width                   int; width of the video frames, in pixels
+            height                  int; height of the video frames, in pixels
+            errorFile               binary file object; receives the error messages of ffmpeg
         """
-        Returns a video writer object
+        command = [
+            "ffmpeg", "-loglevel", "error", "-y",
+            "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", "30", "-i", "-",
+            # H.264 in yuv420p needs even frame dimensions
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-c:v", "libx264", "-pix_fmt", "yuv420p", "-b:v", "30M",
+            "-threads", str(self.ffmpeg_threads),
+            filename
+        ]
+        return subprocess.Popen(command, stdin=subprocess.PIPE, stderr=errorFile, bufsize=self.PIPE_BUFFER_SIZE)
+
+    def _decodeFrames(self, schedule, blackImage, frameShape, frameQueue, stop):
         """
-        fourcc = cv2.VideoWriter_fourcc(*fourccType)
-        writer = cv2.VideoWriter(filename, fourcc, 30, (width, height), True)
-        return writer
+        Reads the images named in a frame schedule, places each pair side-by-side, and puts the resulting
+        (frame, frameTime) pairs on frameQueue.  A None is put on the queue when there are no more frames.
+        This runs on its own thread, so decoding overlaps with the encoding done by ffmpeg.
+        Inputs:
+            schedule                list; (frameTime, view1 path, view2 path, primary) records from _buildSchedule
+            blackImage              numpy array; image used when a view has no image for a frame
+            frameShape              tuple; shape of the video frames
+            frameQueue              queue.Queue; receives the composited frames
+            stop                    threading.Event; set when the frames are no longer wanted
+        """
+        try:
+            # frames are drawn into a ring of canvases; a canvas is reused only after the consumer has written it
+            canvases = [np.zeros(frameShape, dtype=np.uint8) for _ in range(self.FRAME_QUEUE_SIZE + 2)]
+            canvasIdx = 0
+
+            # after its last image, a view is shown as a black image
+            lasts = [-1, -1]    # index of the last frame with a new image, for each view
+            for i, (_, path1, path2, _) in enumerate(schedule):
+                if path1 is not None:
+                    lasts[0] = i
+                if path2 is not None:
+                    lasts[1] = i
+
+            # loop over all the frames
+            viewImages = [blackImage, blackImage]
+            frameCounter = 0    # counter for eye candy
+            for i, (frameTime, path1, path2, primary) in enumerate(schedule):
+                if stop.is_set():
+                    break
+                paths = (path1, path2)
+
+                # read the image that sets the frame's time
+                primaryImage = cv2.imread(paths[primary], self.IMREAD_FLAGS)
+                if primaryImage is None:
+                    print("Unable to read image: " + paths[primary])
+
+                # read the image paired with it; if it cannot be read, the previous image of its view is kept
+                other = 1 - primary
+                pairedImage = None
+                if i > lasts[other]:
+                    viewImages[other] = blackImage
+                elif paths[other] is not None:
+                    pairedImage = cv2.imread(paths[other], self.IMREAD_FLAGS)
+                    if pairedImage is None:
+                        print("Unable to read image: " + paths[other])
+                    else:
+                        viewImages[other] = pairedImage
+
+                # if the primary image cannot be read, its view is shown as black next to a newly read 
+                # paired image; the frame is skipped when there is no new image to show
+                if primaryImage is None:
+                    if pairedImage is None:
+                        continue
+                    primaryImage = blackImage
+                viewImages[primary] = primaryImage
+
+                try:
+                    # place the images side-by-side
+                    canvas = self.concatImages(viewImages[0], viewImages[1], self.app_config.compose_scale, canvases[canvasIdx])
+                    canvases[canvasIdx] = canvas
+
+                    # queue the new frame for encoding; frames of any other size cannot be encoded
+                    if canvas.shape == frameShape:
+                        frameQueue.put((canvas, frameTime))
+                        canvasIdx = (canvasIdx + 1) % len(canvases)
+                except:
+                    pass
+
+                # eye candy / progress indicator
+                frameCounter += 1
+                if self.show_progress:
+                    if (frameCounter % 36) == 0:
+                        print(".", end="", flush=True)
+                    if (frameCounter % 720) == 0:
+                        print()
+        finally:
+            frameQueue.put(None)
 
     def getConfigFilename(self):
         """
@@ -210,6 +352,46 @@ class ComposeVideo:
         base, _ = os.path.splitext(__file__)
         return base + ".config"
 
+    def _imageSize(self, filename):
+        """
+        Returns the (width, height) of an image, or None if the image cannot be read.  For a JPEG file
+        only the headers up to its start-of-frame marker are read; any other file is decoded.
+        """
+        try:
+            with open(filename, "rb") as f:
+                if f.read(2) == b"\xff\xd8":
+                    while True:
+                        marker = f.read(2)
+                        if (len(marker) < 2) or (marker[0] != 0xFF):
+                            break
+                        while (len(marker) == 2) and (marker[1] == 0xFF):
+                            # skip fill bytes
+                            marker = marker[1:] + f.read(1)
+                        if len(marker) < 2:
+                            # the file ends in fill bytes
+                            break
+                        code = marker[1]
+                        if (0xD0 <= code <= 0xD9) or (code == 0x01):
+                            # these markers have no payload
+                            continue
+                        if code == 0xDA:
+                            # start of scan, with no frame header before it
+                            break
+                        length = struct.unpack(">H", f.read(2))[0]
+                        if (0xC0 <= code <= 0xCF) and (code not in (0xC4, 0xC8, 0xCC)):
+                            # start of frame: sample precision, height, width
+                            height, width = struct.unpack(">xHH", f.read(5))
+                            return (width, height)
+                        f.seek(length - 2, os.SEEK_CUR)
+        except (OSError, struct.error):
+            pass
+
+        # fall back to decoding the image
+        img = cv2.imread(filename, self.IMREAD_FLAGS)
+        if img is None:
+            return None
+        return (img.shape[1], img.shape[0])
+
     def imagesPlusImagesCompose(self, view1_ImageDir, view2_ImageDir, videoOut, imageExtension, indexFilename):
         """
         Create a time-aligned video that concatenates still images from two views.
@@ -231,103 +413,79 @@ class ComposeVideo:
             print("[ERROR] No image files found in " + view1_ImageDir)
             return
         else:
-            # load the first image in the view2 image list to find its dimensions
-            img = Image.open(view2Files[0][1])
-            IMAGE_SIZE = (img.width, img.height)
-            # load the first image in the view1 image list to find its dimensions
-            img = Image.open(view1Files[0][1])
-            VIDEO_SIZE = (img.width, img.height)
+            # find the dimensions of the first image in the view2 image list
+            IMAGE_SIZE = self._imageSize(view2Files[0][1])
+            if IMAGE_SIZE is None:
+                print("[ERROR] Unable to read image: " + view2Files[0][1])
+                return
+            # find the dimensions of the first image in the view1 image list
+            VIDEO_SIZE = self._imageSize(view1Files[0][1])
+            if VIDEO_SIZE is None:
+                print("[ERROR] Unable to read image: " + view1Files[0][1])
+                return
 
         # initialize the video output stream
         scaledImageWidth = int(((VIDEO_SIZE[1] / IMAGE_SIZE[1]) * IMAGE_SIZE[0]) * self.app_config.compose_scale)
-        writer = self.createVideoWriter(videoOut, self.COMPRESSOR,
-                                        int(VIDEO_SIZE[0] * self.app_config.compose_scale) + scaledImageWidth + 10,
-                                        int(VIDEO_SIZE[1] * self.app_config.compose_scale))
+        videoWidth = int(VIDEO_SIZE[0] * self.app_config.compose_scale) + scaledImageWidth + 10
+        videoHeight = int(VIDEO_SIZE[1] * self.app_config.compose_scale)
+        # ffmpeg's messages go to a file rather than a pipe, so they can never fill up and stall it
+        ffmpegErrors = tempfile.TemporaryFile()
+        pipe = self.createVideoPipe(videoOut, videoWidth, videoHeight, ffmpegErrors)
+        frameShape = (videoHeight, videoWidth, 3)
 
         # create a black image to use on occassion
-        blackImage = Image.new("RGB", IMAGE_SIZE)
+        blackImage = np.zeros((IMAGE_SIZE[1], IMAGE_SIZE[0], 3), dtype=np.uint8)
+
+        # decode and composite the images on another thread while this one feeds ffmpeg
+        frameQueue = queue.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+        stop = threading.Event()
+        schedule = self._buildSchedule(view1Files, view2Files, self.app_config.max_interval)
+        decoder = threading.Thread(
+            target=self._decodeFrames,
+            args=(schedule, blackImage, frameShape, frameQueue, stop)
+        )
+        decoder.start()
 
         # create a time index file
-        with open(indexFilename, "w") as indexFile:
-            frameTime = None    # time value to use for this frame of video; top is preferred
-
-            # loop over all the images
-            view1Image = blackImage
-            view2Image = blackImage
-            frameCounter = 0    # counter for eye candy
-            while (len(view2Files) > 0) or (len(view1Files) > 0):
-                if len(view2Files) == 0:
-                    view2Image = blackImage
-                    f = view1Files.pop(0)
-                    frameTime = trailcamutils.datetimeFromImageFilename(f[1], self.app_config.prefix, self.app_config.views)
-                    try:
-                        view1Image = Image.open(f[1])
-                    except Exception as e:
-                        print(e)
-                        continue
-                elif len(view1Files) == 0:
-                    view1Image = blackImage
-                    f = view2Files.pop(0)
-                    frameTime = trailcamutils.datetimeFromImageFilename(f[1], self.app_config.prefix, self.app_config.views)
+        decoded = False     # indicates if every frame from the decoder was written
+        try:
+            with open(indexFilename, "w") as indexFile:
+                while True:
+                    item = frameQueue.get()
+                    if item is None:
+                        decoded = True
+                        break
+                    frame, frameTime = item
                     try:
-                        view2Image = Image.open(f[1])
-                    except Exception as e:
-                        print(e)
-                        continue
-                elif view1Files[0][0] < view2Files[0][0]:
-                    # time of topFile is earlier
-                    f = view1Files.pop(0)
-                    frameTime = trailcamutils.datetimeFromImageFilename(f[1], self.app_config.prefix, self.app_config.views)
-                    try:
-                        view1Image = Image.open(f[1])
-                    except Exception as e:
-                        print(e)
-                        continue
-                    # check if frontalFiles[0] is close enough to topImage for a match
-                    if (abs((view2Files[0][0] - f[0]).total_seconds()) < self.app_config.max_interval):
-                        f = view2Files.pop(0)
-                        try:
-                            view2Image = Image.open(f[1])
-                        except Exception as e:
-                            print(e)
-
-                else:
-                    # time of frontalFile is earlier
-                    f = view2Files.pop(0)
-                    frameTime = trailcamutils.datetimeFromImageFilename(f[1], self.app_config.prefix, self.app_config.views)
-                    try:
-                        view2Image = Image.open(f[1])
-                    except Exception as e:
-                        print(e)
-                        continue
-                    # check if topFiles[0] is close enough to frontalImage for a match
-                    if (abs((view1Files[0][0] - f[0]).total_seconds()) < self.app_config.max_interval):
-                        f = view1Files.pop(0)
-                        try:
-                            view1Image = Image.open(f[1])
-                        except Exception as e:
-                            print(e)
-                try:
-                    # place the images side-by-side
-                    newFrame = self.concatImages(view1Image, view2Image, self.app_config.compose_scale)
-
-                    # write the new frame to video output
-                    writer.write(newFrame)
-
+                        # write the new frame to the ffmpeg pipe
+                        pipe.stdin.write(frame.data)
+                    except OSError:
+                        # ffmpeg has exited (a broken pipe, or EINVAL on Windows); its error is reported below
+                        break
                     # append frameTime to index file
                     indexFile.write(f"{frameTime}\n")
-                except:
-                    pass
-
-                # eye candy / progress indicator
-                frameCounter += 1
-                if (frameCounter % 36) == 0:
-                    print(".", end="", flush=True)
-                if (frameCounter % 720) == 0:
-                    print()
-
-        # release the video file pointer
-        writer.release()
+        finally:
+            # stop the decoder, draining the queue so it is not left blocked on a full queue
+            stop.set()
+            finished = decoded
+            while not finished:
+                finished = frameQueue.get() is None
+            decoder.join()
+
+            # close the pipe and wait for ffmpeg to finish encoding
+            pipe.communicate()
+            if pipe.returncode != 0:
+                ffmpegErrors.seek(0)
+                messages = ffmpegErrors.read().decode(errors="replace").strip().splitlines()
+                print(f"[ERROR] ffmpeg failed with exit code {pipe.returncode} while creating {videoOut}")
+                for line in messages[-5:]:
+                    print("    " + line)
+            ffmpegErrors.close()
+            if (pipe.returncode != 0) or not decoded:
+                # remove the partial video, and the index of its frames, so the video is created again next time
+                for filename in (videoOut, indexFilename):
+                    if os.path.exists(filename):
+                        os.remove(filename)
 
     def main(self, sourceFolder, destinationFolder, imageExtension="jpg", force=False, composite=True):
         """
@@ -374,11 +532,43 @@ class ComposeVideo:
         else:
             limit = len(dirs) - 1
 
-        for i in range(0, limit):
-            day = dirs[i]
-            dayFolder = os.path.join(sitePath, day)
-            if os.path.isdir(dayFolder):
+        days = [day for day in dirs[:limit] if os.path.isdir(os.path.join(sitePath, day))]
+
+        # the days are independent, so their videos are created in parallel worker processes
+        cpuCount = os.cpu_count() or 1
+        workers = self.app_config.workers if self.app_config.workers > 0 else max(1, cpuCount // 2)
+        if workers == 1:
+            for day in days:
                 self.processDay(sourceFolder, destinationFolder, siteID, day, imageExtension)
+        else:
+            # share the CPU cores among the ffmpeg encoders of the workers
+            ffmpegThreads = max(1, cpuCount // workers)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(
+                        processDayWorker,
+                        self.config_file,
+                        self.app_config.force,
+                        self.app_config.create_composite,
+                        ffmpegThreads,
+                        sourceFolder,
+                        destinationFolder,
+                        siteID,
+                        day,
+                        imageExtension
+                    ): day
+                    for day in days
+                }
+
+                # the workers' output interleaves, so report each day as it finishes; a failed 
+                # day is reported without stopping the others
+                for future in concurrent.futures.as_completed(futures):
+                    day = futures[future]
+                    try:
+                        future.result()
+                        print(f"Finished {siteID} {day}")
+                    except Exception as e:
+                        print(f"[ERROR] Unable to create videos for {siteID} {day}: {e}")
 
     def processDay(self, sourceFolder, destinationFolder, siteID, day, imageExtension):
         """
@@ -400,7 +590,8 @@ class ComposeVideo:
         for f in files:
             _, _, _, date, time = trailcamutils.splitImageFilename(f, self.app_config.prefix, self.app_config.views)
             try:
-                dt = datetime.datetime.strptime(date + ' ' + time, '%Y-%m-%d %H:%M:%S')
+                # the date and time are in ISO format, which fromisoformat parses much faster than strptime
+                dt = datetime.datetime.fromisoformat(date + ' ' + time)
                 answer.append((dt, os.path.join(sourceDir, f)))
             except Exception:
                 print("Bad datetime: ", f)
@@ -470,15 +661,40 @@ class ComposeVideo:
             import glob
             filenames = glob.glob(os.path.join(imageDir, f"*{ext}"))
             filenames.sort()
-            with open("ffmpeg_input.txt", "w") as outfile:
+            # (named after the video, as several days may be processed at once)
+            inputFilename = os.path.splitext(videoFilename)[0] + "_ffmpeg_input.txt"
+            with open(inputFilename, "w") as outfile:
                 for filename in filenames:
                     fname = os.path.abspath(filename).replace('\\', '/')
                     outfile.write(f"file '{fname}'\n")
-            os.system(f'ffmpeg -loglevel error -y -safe 0 -f concat -i ffmpeg_input.txt -framerate 30 -b:v 30M "{videoFilename}"')
-            os.remove("ffmpeg_input.txt")
+            os.system(f'ffmpeg -loglevel error -y -safe 0 -f concat -i "{inputFilename}" -framerate 30 -b:v 30M -threads {self.ffmpeg_threads} "{videoFilename}"')
+            os.remove(inputFilename)
         else:
             pattern = os.path.join(imageDir, f"*{ext}")
-            os.system(f'ffmpeg -y -pattern_type glob -framerate 30 -i "{pattern}" -b:v 30M "{videoFilename}"')
+            os.system(f'ffmpeg -y -pattern_type glob -framerate 30 -i "{pattern}" -b:v 30M -threads {self.ffmpeg_threads} "{videoFilename}"')
+
+
+def processDayWorker(configFile, force, composite, ffmpegThreads, sourceFolder, destinationFolder, siteID, day, imageExtension):
+    """
+    Creates the videos for one day in a worker process.  A new ComposeVideo is built from the
+    configuration file, so the calling object does not need to be pickled.
+    Inputs:
+        configFile          string; path to the configuration file
+        force               boolean; indicates if video should always be created, even if one of the same name already exists
+        composite           boolean; indicates if the composite (side-by-side) video should be created
+        ffmpegThreads       int; number of threads each ffmpeg encode may use
+        sourceFolder        string; folder containing the sites to be processed
+        destinationFolder   string; path for video output files
+        siteID              string; the ID of the site to process
+        day                 string; the date (folder name) to process
+        imageExtension      string; the file extension of still images
+    """
+    app = ComposeVideo(configFile)
+    app.app_config.force = force
+    app.app_config.create_composite = composite
+    app.ffmpeg_threads = ffmpegThreads
+    app.show_progress = False
+    app.processDay(sourceFolder, destinationFolder, siteID, day, imageExtension)
 
 
 def parseCommandLine():
@@ -35,6 +35,7 @@ implementation.
 import os
 
 # 3rd party modules
+import cv2
 import numpy as np
 
 # modules that are part of this package
@@ -42,6 +43,8 @@ from . trailcamutils import imagePathFromFilename
 
 
 class TrailCamObjectDetector:
+    THUMBNAIL_SIZE = 64         # width and height of the thumbnails compared to find unchanged images
+
     def __init__(self, app_config):
         """
         Input:
@@ -58,6 +61,9 @@ class TrailCamObjectDetector:
         settings = app_config.app_config["Animal_Detector"]
         self.nms_overlap = float(settings.get("max_nms_overlap", 0.1))  # maximum fraction of bounding box overlap allowed before non-maxima suppression routine prunes smaller box 
         self.supported_views = settings.get("supported_views", "")      # abbreviated names of views detector can be run on
+        self.unchanged_threshold = float(settings.get(                  # mean thumbnail pixel difference below which an image reuses 
+            "unchanged_threshold", 0))                                  #   the detections of the previous image in its folder; 0 disables
+        self.previous_detections = {}                                   # maps image folder to (thumbnail, boxes) of the last image detection was run on
 
         # split supported_views string into a list of views
         self.supported_views = [x.strip() for x in self.supported_views.split(",")]
@@ -85,9 +91,22 @@ class TrailCamObjectDetector:
                                     run.
         """
         if (abbrev_view is None) or (abbrev_view in self.supported_views):
-            # detect objects
-            boxes = self._object_detection(image_file) 
-            boxes2 = self._postprocessBoxes(boxes)      
+            # images that barely differ from the last image detection was run on in the same
+            # folder (e.g. bursts and empty triggers) reuse its detections
+            thumbnail = None
+            previous = None
+            if self.unchanged_threshold > 0:
+                thumbnail = self._thumbnail(image_file)
+                previous = self.previous_detections.get(os.path.dirname(image_file))
+            if ((thumbnail is not None) and (previous is not None) and 
+                (np.mean(np.abs(thumbnail - previous[0])) < self.unchanged_threshold)):
+                boxes2 = previous[1]
+            else:
+                # detect objects
+                boxes = self._object_detection(image_file) 
+                boxes2 = self._postprocessBoxes(boxes)      
+                if thumbnail is not None:
+                    self.previous_detections[os.path.dirname(image_file)] = (thumbnail, boxes2)
 
             # log the number of detected objects  
             count = len(boxes2)                                       
@@ -225,6 +244,22 @@ class TrailCamObjectDetector:
         return answer.tolist()
     
 
+    def _thumbnail(self, image_file):
+        """
+        Returns a small grayscale version of an image, used to check if an image has changed.
+        Inputs:
+            image_file      string; path to image
+        Returns:
+            THUMBNAIL_SIZE x THUMBNAIL_SIZE int16 numpy array, or None if the image cannot be read
+        """
+        # let the JPEG decoder do most of the downsampling
+        img = cv2.imread(image_file, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if img is None:
+            return None
+        size = (self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE)
+        return cv2.resize(img, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
     def _write_boxes(self, file_path, boxes, color):
         """
         Write information about the detections to a text file.
@@ -194,6 +194,7 @@ class Annotation(object):
 
 
 class AnnotationList(QtCore.QObject):
+    added = QtCore.Signal(object)       # emitted with the new Annotation just before modified, when add() inserts one
     modified = QtCore.Signal()
 
     def __init__(self):
@@ -224,6 +225,7 @@ class AnnotationList(QtCore.QObject):
             if self._debug:
                 print(annotation,'added')
             if not self._suppressSignals:
+                self.added.emit(annotation)
                 self.modified.emit()
         elif self._debug:
             print(annotation, 'already present')
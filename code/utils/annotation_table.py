@@ -24,6 +24,23 @@ class AnnotationTable(QTableWidget):
         self.resizeColumnsToContents()
         self.itemChanged.connect(self.itemChangedHandler)
 
+    def addAnnotations(self, annotations):
+        """
+        Adds rows for the specified newly added annotations, without rebuilding the
+        rest of the table.
+        """
+        self._filling = True
+        self.setSortingEnabled(False)
+        for annotation in annotations:
+            if self._isShown(annotation):
+                i = self.rowCount()
+                self.insertRow(i)
+                self._setRow(i, annotation)
+                self.scrollToItem(self.item(i,0))
+        self.resizeColumnsToContents()
+        self.setSortingEnabled(True)
+        self._filling = False
+
     def fillTable(self):
         """
         Clears the table and then fills it with data from self._annotations
@@ -35,17 +52,9 @@ class AnnotationTable(QTableWidget):
         self.setRowCount(len(self._annotations))
         i = 0
         for annotation in self._annotations:   
-            if ((self._client.app_config.countOnly and (annotation.getIndividual() == "count")) or 
-                ((not self._client.app_config.countOnly) and (annotation.getIndividual() != "AI_count") and (annotation.getIndividual() != "count")) or
-                (annotation.getBehavior() in self._client.focalBehaviors) or
-                (annotation.getBehavior() in self._client.commensalBehaviors)):               
+            if self._isShown(annotation):
                 self.insertRow(i)
-                self.setItem(i, 0, QtWidgets.QTableWidgetItem(str(annotation.startFrame)))
-                end = "" if annotation.endFrame is None else str(annotation.endFrame)
-                self.setItem(i, 1, QtWidgets.QTableWidgetItem(end))
-                self.setItem(i, 2, QtWidgets.QTableWidgetItem(annotation.behavior))            
-                self.setItem(i, 3, QtWidgets.QTableWidgetItem(annotation.individual))
-                self.setItem(i, 4, QtWidgets.QTableWidgetItem(annotation.kind))
+                self._setRow(i, annotation)
                 self.scrollToItem(self.item(i,0))
                 i += 1
         self.setRowCount(i)                
@@ -74,6 +83,15 @@ class AnnotationTable(QTableWidget):
                     return (frame, self.item(i, 2).text(), self.item(i, 3).text(), self.item(i, 4).text())
         return None
 
+    def _isShown(self, annotation):
+        """
+        Returns True if the specified annotation should have a row in the table.
+        """
+        return ((self._client.app_config.countOnly and (annotation.getIndividual() == "count")) or 
+                ((not self._client.app_config.countOnly) and (annotation.getIndividual() != "AI_count") and (annotation.getIndividual() != "count")) or
+                (annotation.getBehavior() in self._client.focalBehaviors) or
+                (annotation.getBehavior() in self._client.commensalBehaviors))
+
     def itemChangedHandler(self, item):
         """
         This method is run when an item is changed.  If the new value is legal,
@@ -163,4 +181,15 @@ class AnnotationTable(QTableWidget):
                     self.scrollToItem(self.item(i, 0))
                     self.selectRow(i)
                     return i
-        return None
\ No newline at end of file
+        return None
+
+    def _setRow(self, i, annotation):
+        """
+        Fills row i of the table with the fields of the specified annotation.
+        """
+        self.setItem(i, 0, QtWidgets.QTableWidgetItem(str(annotation.startFrame)))
+        end = "" if annotation.endFrame is None else str(annotation.endFrame)
+        self.setItem(i, 1, QtWidgets.QTableWidgetItem(end))
+        self.setItem(i, 2, QtWidgets.QTableWidgetItem(annotation.behavior))            
+        self.setItem(i, 3, QtWidgets.QTableWidgetItem(annotation.individual))
+        self.setItem(i, 4, QtWidgets.QTableWidgetItem(annotation.kind))
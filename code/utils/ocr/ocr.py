@@ -50,6 +50,7 @@ classifier for your camera, see the file "ocr_digit_convnet_training.py" for an
 
 # standard Python modules
 from datetime import datetime
+import hashlib
 import os
 import random
 
@@ -66,11 +67,14 @@ from .. trailcamutils import createDatetime, parseSerialNumber, getFilePathsInSu
 
 class TrailCamOCR:
     DEBUG_OCR = False   # setting this to True causes information about pixel counts for each block to be printed
+    INFO_FIELDS = ("date", "time", "serialNumber")      # banner fields read by extractImageInfo
 
     def __init__(self):
         # self.codebooks is organized by camera model and image size.  Each image size dictionary should contain
         # the following keys:
         #   function        digit extraction function for this image
+        #   pixels          (optional) function returning the classifier input for a digit, used to 
+        #                   classify the digits of many images with a single call to the model
         #   datafile        path to file containing the model for this image size
         #   xwidth          width of image block containing digit
         #   ycoords         the starting and ending y-coordinates for all text blocks, as a pair
@@ -85,6 +89,7 @@ class TrailCamOCR:
                 # "datafile": "digits_kNN_meidase_2560x1440.csv",
                 ## CONVNET model
                 "function": self.digit_meidase_CNN,
+                "pixels": self.digitPixels_meidase_CNN,
                 "datafile": "digits_CNN_meidase_2560x1440.keras", 
 
                 "xwidth" : 46,
@@ -153,6 +158,25 @@ class TrailCamOCR:
         if "cnn" not in codebook:
             self.create_CNN(codebook)
 
+        pixels = np.asarray([self.digitPixels_meidase_CNN(codebook, field, index, img)])
+
+        # apply the model
+        pred = np.argmax(codebook["cnn"](pixels), axis=1)
+        return str(pred[0])
+    
+
+    def digitPixels_meidase_CNN(self, codebook, field, index, img):
+        """
+        Prepares the box containing a digit in a Meidase SL122 Pro camera image for the 
+        Convolutional Neural Network classifier.
+        Inputs:
+            codebook        codebook dictionary for this image type
+            field           string; field to extract
+            index           integer; index of digit in field to extract
+            img             grayscale numpy image
+        Returns:
+            A float32 numpy array of shape (height, width, 1) holding the binarized digit.
+        """ 
         # pixels with value >= threshold are considered white
         threshold = 245
 
@@ -173,12 +197,8 @@ class TrailCamOCR:
 
         # convert the pixels to floats
         pixels = pixels.astype("float32") / 255
-        pixels = np.asarray([np.expand_dims(pixels, -1)])
+        return np.expand_dims(pixels, -1)
 
-        # apply the model
-        pred = np.argmax(codebook["cnn"](pixels), axis=1)
-        return str(pred[0])
-    
 
     def digit_meidase_kNN(self, codebook, field, index, img):
         """
@@ -229,8 +249,7 @@ class TrailCamOCR:
 
     def extractDate(self, img, cameraModel, sep=""):
         digits = self.extractDigits(img, "date", cameraModel)
-        parts = [ "".join(digits[:4]), "".join(digits[4:6]), "".join(digits[6:])]
-        return sep.join(parts)
+        return self.formatDate(digits, sep)
 
 
     def extractDigits(self, img, field, cameraModel):
@@ -260,7 +279,7 @@ class TrailCamOCR:
         return answer
 
 
-    def extractImageInfo(self, filename, views={}, cameraModel="meidase_SL122_Pro"):
+    def extractImageInfo(self, filename, views={}, cameraModel="meidase_SL122_Pro", data=None):
         """
         Extract information from the text burned into the bottom of a trail camera image.
         The cameraModel and image size are combined to determine the name of the codebook
@@ -268,30 +287,106 @@ class TrailCamOCR:
             filename        string; path to image file
             views           dictionary mapping digits to (full view name, abbreviated view name)
             cameraModel     string; unique identifier for the camera model used to take image
+            data            bytes; contents of the image file, or None to read the file
         Returns:
             A tuple of the form (camera_ID, abbreviated_view, date, time)
         """
         # load a grayscale version of the image
-        grayImg = cv2.imread(filename, cv2.IMREAD_GRAYSCALE)    
-        if grayImg is None:
-            raise Exception("extractImageInfo: Unable to read image " + filename)     
+        grayImg = self.readGrayImage(filename, data)
         
         # extract text from image using OCR
         date = self.extractDate(grayImg, cameraModel, "-")
         time = self.extractTime(grayImg, cameraModel)
         serialNumber = self.extractSerialNumber(grayImg, cameraModel)
+        return self.parseImageInfo(date, time, serialNumber, views)
 
-        # If the date or time is not valid, the image is probably corrupt.
-        # The following code will throw an error if the date or time is not valid.
-        dt = datetime.strptime(createDatetime(date, time), "%Y%m%d-%H%M%S")
 
-        # if the date is in the future, the image is corrupt
-        if (dt > datetime.now()):
-            raise Exception("Trailcam OCR date is in the future; image is probably corrupt")
+    def extractImageInfoBatch(self, filenames, views={}, cameraModel="meidase_SL122_Pro", contents=None):
+        """
+        Extract information from the text burned into the bottom of several trail camera images.
+        When the codebook provides a "pixels" function, the digits of all the images are
+        classified with a single call to the model; otherwise each image is processed
+        with extractImageInfo.  Images in a burst often have identical banners, so an image
+        whose banner pixels match an earlier image in the batch reuses that image's result.
+        Inputs:
+            filenames       list of strings; paths to image files
+            views           dictionary mapping digits to (full view name, abbreviated view name)
+            cameraModel     string; unique identifier for the camera model used to take image
+            contents        list of bytes; contents of each image file (None entries are read
+                            from the file), or None to read all of the files
+        Returns:
+            A list with one entry per file, either a tuple of the form 
+            (camera_ID, abbreviated_view, date, time) or the Exception raised for that file
+        """
+        answer = [None] * len(filenames)
+        banners = {}        # maps hash of banner pixels to index of first image with that banner
+        batches = {}        # maps codebook name to (codebook, indices of images, digit pixels)
+        duplicates = []     # (index of image, index of earlier image with identical banner)
+        if contents is None:
+            contents = [None] * len(filenames)
+        for i, filename in enumerate(filenames):
+            try:
+                # load a grayscale version of the image
+                grayImg = self.readGrayImage(filename, contents[i])
+
+                # get the codebook for images of this size
+                imgSize = f"{cameraModel}_{grayImg.shape[1]}x{grayImg.shape[0]}"
+                if imgSize not in self.codebooks:
+                    raise KeyError(f"No codebook for {cameraModel} images of size {imgSize}")
+                codebook = self.codebooks[imgSize]
+
+                # skip the OCR if an earlier image has exactly the same banner
+                yStart, yEnd = codebook["ycoords"]
+                banner = hashlib.blake2b(grayImg[yStart:yEnd].tobytes(), digest_size=16).digest()
+                if banner in banners:
+                    duplicates.append((i, banners[banner]))
+                    continue
+                banners[banner] = i
+
+                if "pixels" not in codebook:
+                    # this codebook's digits can only be classified one image at a time
+                    answer[i] = self.extractImageInfo(filename, views, cameraModel, contents[i])
+                    continue
+
+                # collect the pixels for every digit in the banner
+                digits = [codebook["pixels"](codebook, field, index, grayImg) 
+                          for field in self.INFO_FIELDS for index in range(len(codebook[field]))]
+                if imgSize not in batches:
+                    batches[imgSize] = (codebook, [], [])
+                batches[imgSize][1].append(i)
+                batches[imgSize][2].extend(digits)
+            except Exception as e:
+                answer[i] = e
 
-        # parse the serial number
-        camera_ID, view, _ = parseSerialNumber(serialNumber, views)
-        return camera_ID, view, date, time
+        for codebook, indices, pixels in batches.values():
+            try:
+                # check if a classifier has been initialized for this codebook
+                if "cnn" not in codebook:
+                    self.create_CNN(codebook)
+                # apply the model to all the digits at once
+                preds = np.argmax(codebook["cnn"](np.asarray(pixels)), axis=1)
+            except Exception as e:
+                # the model failed, so every image that needed it fails
+                for i in indices:
+                    answer[i] = e
+                continue
+
+            digitCount = len(pixels) // len(indices)
+            dateEnd = len(codebook["date"])
+            timeEnd = dateEnd + len(codebook["time"])
+            for n, i in enumerate(indices):
+                digits = [str(d) for d in preds[n * digitCount:(n + 1) * digitCount]]
+                date = self.formatDate(digits[:dateEnd], "-")
+                time = self.formatTime(digits[dateEnd:timeEnd])
+                serialNumber = "".join(digits[timeEnd:])
+                try:
+                    answer[i] = self.parseImageInfo(date, time, serialNumber, views)
+                except Exception as e:
+                    answer[i] = e
+
+        for i, original in duplicates:
+            answer[i] = answer[original]
+        return answer
 
 
     def extractTime(self, img, cameraModel, sep=""):
@@ -299,8 +394,7 @@ class TrailCamOCR:
         Return the time field from an image.
         """
         digits = self.extractDigits(img, "time", cameraModel)
-        parts = [ "".join(digits[:2]), "".join(digits[2:4]), "".join(digits[4:])]
-        return sep.join(parts)
+        return self.formatTime(digits, sep)
 
 
     def extractSerialNumber(self, img, cameraModel):
@@ -409,6 +503,22 @@ class TrailCamOCR:
         return answer
 
 
+    def formatDate(self, digits, sep=""):
+        """
+        Returns the date built from a list of eight digits in the order YYYYMMDD.
+        """
+        parts = [ "".join(digits[:4]), "".join(digits[4:6]), "".join(digits[6:])]
+        return sep.join(parts)
+
+
+    def formatTime(self, digits, sep=""):
+        """
+        Returns the time built from a list of six digits in the order HHMMSS.
+        """
+        parts = [ "".join(digits[:2]), "".join(digits[2:4]), "".join(digits[4:])]
+        return sep.join(parts)
+
+
     def generateTrainingDataKNN(self, folder, frac, outputFilename, maxFiles=10_000, 
             cameraModel="meidase_SL122_Pro", prefix="B", views = {0:("Top","T"), 1:("Frontal", "F")}):
         """
@@ -500,6 +610,46 @@ class TrailCamOCR:
             self.fieldPixelImages(img, "serialNumber", camera_ID, sampleCounts, maxSamples, outputFolder, cameraModel)            
 
 
+    def parseImageInfo(self, date, time, serialNumber, views={}):
+        """
+        Checks the fields read from an image banner and parses the camera serial number.
+        Inputs:
+            date            string; date in the format YYYY-MM-DD
+            time            string; time in the format HHMMSS
+            serialNumber    string; camera serial number
+            views           dictionary mapping digits to (full view name, abbreviated view name)
+        Returns:
+            A tuple of the form (camera_ID, abbreviated_view, date, time)
+        """
+        # If the date or time is not valid, the image is probably corrupt.
+        # The following code will throw an error if the date or time is not valid.
+        dt = datetime.strptime(createDatetime(date, time), "%Y%m%d-%H%M%S")
+
+        # if the date is in the future, the image is corrupt
+        if (dt > datetime.now()):
+            raise Exception("Trailcam OCR date is in the future; image is probably corrupt")
+
+        # parse the serial number
+        camera_ID, view, _ = parseSerialNumber(serialNumber, views)
+        return camera_ID, view, date, time
+
+
+    def readGrayImage(self, filename, data=None):
+        """
+        Returns a grayscale version of an image.
+        Inputs:
+            filename        string; path to image file
+            data            bytes; contents of the image file, or None to read the file
+        """
+        if data is None:
+            grayImg = cv2.imread(filename, cv2.IMREAD_GRAYSCALE)    
+        else:
+            grayImg = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if grayImg is None:
+            raise Exception("extractImageInfo: Unable to read image " + filename)     
+        return grayImg
+
+
     def testFolderOfImages(self, folder, cameraModel="meidase_SL122_Pro", 
             views={'0':("Top","T"), '1':("Frontal", "F")},  prefix="B", maxFiles=10_000):
         """
@@ -5,17 +5,72 @@ Mike Hilton, Eckerd College
 
 # standard Python modules
 from datetime import datetime
+import errno
 import os
+import shutil
 
 # 3rd party modules
 from exif import Image  
 
+COPY_BUFFER_SIZE = 1 << 20              # size of the buffer used when the kernel cannot copy the file itself
+COPY_CHUNK_SIZE = 1 << 30               # maximum number of bytes requested from the kernel per copy call
+# errors meaning a kernel copy function cannot be used for this pair of files
+COPY_FALLBACK_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSOCK, errno.EBADF}
+
 def convertPythonDatetimeToTrailcamDatetime(pythonDatetime):
     return pythonDatetime.strftime("%Y%m%d-%H%M%S")
 
 def convertTrailcamDatetimeToPythonDatetime(trailcamDatetime):
     return datetime.strptime(trailcamDatetime, "%Y%m%d-%H%M%S")
 
+def copyFile(source, destination):
+    """
+    Copies the contents of the source file to the destination file.  The data is kept in
+    the kernel with os.copy_file_range, or os.sendfile if that is not supported for these
+    files.  When neither is available (e.g. on Windows) the file is copied through a 
+    COPY_BUFFER_SIZE buffer, much larger than shutil's default.  Where posix_fadvise is
+    available, the source file is read sequentially and dropped from the page cache
+    afterwards, so copying a large SD card does not evict more useful cached data.
+    Inputs:
+        source          string; path to the file to copy
+        destination     string; path to the new file
+    Returns:
+        The number of bytes copied.
+    """
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        srcFd = src.fileno()
+        dstFd = dst.fileno()
+        advise = hasattr(os, "posix_fadvise")
+        if advise:
+            # the source is read once from start to finish, so read ahead aggressively
+            os.posix_fadvise(srcFd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        copiers = []
+        if hasattr(os, "copy_file_range"):
+            copiers.append(lambda: os.copy_file_range(srcFd, dstFd, COPY_CHUNK_SIZE))
+        if hasattr(os, "sendfile"):
+            copiers.append(lambda: os.sendfile(dstFd, srcFd, None, COPY_CHUNK_SIZE))
+        try:
+            for copier in copiers:
+                copied = 0
+                try:
+                    while True:
+                        count = copier()
+                        if count == 0:
+                            return copied
+                        copied += count
+                except OSError as e:
+                    # only fall back to the next method if nothing has been copied yet
+                    if (e.errno not in COPY_FALLBACK_ERRORS) or (copied > 0):
+                        raise
+            # the kernel cannot copy these files; copy them through a large buffer
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+            return dst.tell()
+        finally:
+            if advise:
+                # the source will not be read again; release its pages from the cache
+                os.posix_fadvise(srcFd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
 def createAnnotationFilename(site_ID, date, prefix):
     """
     Returns the filename for the specified annotation file.
@@ -42,17 +97,15 @@ def createImageFilename(prefix, camera_ID, date, time, extension, views=None):
     Returns an image filename built from the supplied parts.
     """
     # If views are provided, map the first digit of camera_ID to its abbreviated view name
-    if (views is not None) and (len(views) > 0) and (camera_ID[0] in views):
-        camera = camera_ID[1:] + views[camera_ID[0]][1]
+    if views and (camera_ID[0] in views):
+        camera = f"{camera_ID[1:]}{views[camera_ID[0]][1]}"
     else:
         camera = camera_ID
     # make sure the extension starts with a period
-    if extension[0] == '.':
-        ext = extension
-    else:
-        ext = "." + extension  
+    if extension[0] != '.':
+        extension = "." + extension  
     # build the filename         
-    return prefix + camera + "-" + createDatetime(date, time) + ext   
+    return f"{prefix}{camera}-{date.replace('-', '')}-{time.replace(':', '')}{extension}"
 
 
 def createIndexFilename(prefix, camera_ID, view, date):
@@ -134,12 +187,9 @@ def getFilenamesInFolder(folder, extension='.jpg'):
     answer = []
     with os.scandir(folder) as entries:
         for entry in entries:
-            if entry.is_file():
-                # make sure the file has the proper extension
-                _, ext = os.path.splitext(entry.name) 
-                ext = ext.lower()                        
-                if ext == extension:                        
-                    answer.append(entry.name) 
+            # make sure the file has the proper extension
+            if entry.is_file() and entry.name.lower().endswith(extension):
+                answer.append(entry.name) 
     answer.sort()
     return answer
 
@@ -150,17 +200,19 @@ def getFilePathsInSubfolders(folder, extension='.jpg'):
     """
     extension = extension.lower()
     answer = []
-    with os.scandir(folder) as entries:
-        for entry in entries:
-            if entry.is_file():
-                # make sure the file has the proper extension
-                _, ext = os.path.splitext(entry.name) 
-                ext = ext.lower()                        
-                if ext == extension:                        
-                    answer.append(entry.path) 
-            else:
-                # process subfolder recursively
-                answer.extend(getFilePathsInSubfolders(entry.path, extension))
+    # walk the folder tree with an explicit stack; DirEntry caches the file type read 
+    # from the directory, so no extra stat calls are needed
+    folders = [folder]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    # make sure the file has the proper extension
+                    if entry.name.lower().endswith(extension):
+                        answer.append(entry.path) 
+                else:
+                    # process subfolder
+                    folders.append(entry.path)
     answer.sort()
     return answer
 